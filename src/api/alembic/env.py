@@ -35,13 +35,31 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def _migration_connect_args(url: str) -> dict:
+    """Disable driver-side prepared statement caching for migration connections.
+
+    Each DDL statement runs once, so cached plans are never reused and can go
+    stale after schema changes ("cached statement plan is invalid").
+    """
+    if "+asyncpg" in url:
+        return {"statement_cache_size": 0}
+    if "+psycopg" in url and "+psycopg2" not in url:
+        return {"prepare_threshold": None}
+    return {}
+
+
 def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section) or {}
     url = os.getenv("DATABASE_URL")
     if url is None:
         raise RuntimeError("DATABASE_URL is not set")
     configuration["sqlalchemy.url"] = url
-    connectable = engine_from_config(configuration, prefix="sqlalchemy.", poolclass=pool.NullPool)
+    connectable = engine_from_config(
+        configuration,
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+        connect_args=_migration_connect_args(url),
+    )
     with connectable.connect() as connection:
         context.configure(connection=connection, target_metadata=target_metadata)
         with context.begin_transaction():
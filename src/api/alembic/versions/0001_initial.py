@@ -90,8 +90,12 @@ def upgrade() -> None:
         sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
     )
 
-    op.create_index("idx_tasks_due_status", "tasks", ["due_at", "status"])
-    op.create_index("idx_notes_created", "notes", ["created_at"])
+    # Build indexes outside the transaction so PostgreSQL can use CONCURRENTLY
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "idx_tasks_due_status", "tasks", ["due_at", "status"], postgresql_concurrently=True
+        )
+        op.create_index("idx_notes_created", "notes", ["created_at"], postgresql_concurrently=True)
 
 
 def downgrade() -> None:
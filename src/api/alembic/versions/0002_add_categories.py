@@ -31,16 +31,33 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id')
     )
     
-    # Create unique index on user_id, name
-    op.create_index('ix_categories_user_name', 'categories', ['user_id', 'name'], unique=True)
-    
     # Add category_id column to notes table
+    # NOT VALID skips the full-table check while holding the ALTER TABLE lock
     op.add_column('notes', sa.Column('category_id', sa.Integer(), nullable=True))
-    op.create_foreign_key('fk_notes_category_id', 'notes', 'categories', ['category_id'], ['id'])
+    op.create_foreign_key(
+        'fk_notes_category_id', 'notes', 'categories', ['category_id'], ['id'],
+        postgresql_not_valid=True,
+    )
     
     # Add category_id column to tasks table
     op.add_column('tasks', sa.Column('category_id', sa.Integer(), nullable=True))
-    op.create_foreign_key('fk_tasks_category_id', 'tasks', 'categories', ['category_id'], ['id'])
+    op.create_foreign_key(
+        'fk_tasks_category_id', 'tasks', 'categories', ['category_id'], ['id'],
+        postgresql_not_valid=True,
+    )
+
+    # Non-blocking steps run outside the migration transaction
+    with op.get_context().autocommit_block():
+        # Create unique index on user_id, name
+        op.create_index(
+            'ix_categories_user_name', 'categories', ['user_id', 'name'], unique=True,
+            postgresql_concurrently=True,
+        )
+
+        # Validating only takes a SHARE UPDATE EXCLUSIVE lock, so writes keep flowing
+        if op.get_bind().dialect.name == "postgresql":
+            op.execute("ALTER TABLE notes VALIDATE CONSTRAINT fk_notes_category_id")
+            op.execute("ALTER TABLE tasks VALIDATE CONSTRAINT fk_tasks_category_id")
 
 
 def downgrade() -> None:
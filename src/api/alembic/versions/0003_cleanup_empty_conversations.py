@@ -14,21 +14,44 @@ down_revision = "0002_add_categories"
 branch_labels = None
 depends_on = None
 
+# Rows deleted per transaction; keeps each lock short-lived on large tables
+BATCH_SIZE = 1000
+
 
 def upgrade() -> None:
-    # Delete conversations that have no messages
-    op.execute(
-        sa.text(
-            """
-            DELETE FROM conversations c
-            WHERE NOT EXISTS (
-                SELECT 1 FROM messages m WHERE m.conversation_id = c.id
-            );
-            """
+    # Run outside the migration transaction so every batch commits on its own
+    with op.get_context().autocommit_block():
+        # Index the NOT EXISTS probe so it doesn't seq-scan messages per batch
+        op.create_index(
+            "ix_messages_conversation_id",
+            "messages",
+            ["conversation_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
         )
-    )
+
+        # Delete conversations that have no messages, one batch at a time
+        bind = op.get_bind()
+        while True:
+            result = bind.execute(
+                sa.text(
+                    """
+                    DELETE FROM conversations
+                    WHERE id IN (
+                        SELECT c.id FROM conversations c
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM messages m WHERE m.conversation_id = c.id
+                        )
+                        LIMIT :batch_size
+                    );
+                    """
+                ),
+                {"batch_size": BATCH_SIZE},
+            )
+            if result.rowcount == 0:
+                break
 
 
 def downgrade() -> None:
-    # No-op: cannot restore deleted conversations
-    pass
+    # Cannot restore deleted conversations; only drop the supporting index
+    op.drop_index("ix_messages_conversation_id", table_name="messages")
@@ -0,0 +1,46 @@
+"""Add indexes for category, owner and message-history lookups
+
+Revision ID: 0004_add_lookup_indexes
+Revises: 0003_cleanup_empty_conversations
+Create Date: 2025-09-22 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_add_lookup_indexes"
+down_revision = "0003_cleanup_empty_conversations"
+branch_labels = None
+depends_on = None
+
+# name -> (table, columns)
+INDEXES = {
+    "ix_notes_category": ("notes", ["category_id"]),
+    "ix_tasks_category": ("tasks", ["category_id"]),
+    "ix_notes_user": ("notes", ["user_id"]),
+    "ix_tasks_user_status": ("tasks", ["user_id", "status"]),
+    "ix_conversations_user": ("conversations", ["user_id"]),
+    "ix_messages_conversation_created": (
+        "messages",
+        ["conversation_id", sa.text("created_at DESC")],
+    ),
+}
+
+
+def upgrade() -> None:
+    # Build indexes outside the transaction so PostgreSQL can use CONCURRENTLY
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in INDEXES.items():
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+        # The (conversation_id, created_at) index covers conversation_id lookups
+        op.drop_index(
+            "ix_messages_conversation_id", table_name="messages", postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    op.create_index("ix_messages_conversation_id", "messages", ["conversation_id"])
+    for name, (table, _) in reversed(INDEXES.items()):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,44 @@
+"""Add (owner, created_at) indexes for the listing endpoints
+
+Revision ID: 0005_add_listing_indexes
+Revises: 0004_add_lookup_indexes
+Create Date: 2025-09-29 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005_add_listing_indexes"
+down_revision = "0004_add_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+# name -> (table, columns)
+INDEXES = {
+    "ix_conversations_user_created": ("conversations", ["user_id", sa.text("created_at DESC")]),
+    "ix_notes_user_created": ("notes", ["user_id", sa.text("created_at DESC")]),
+    "ix_tasks_user_created": ("tasks", ["user_id", sa.text("created_at DESC")]),
+}
+
+# Single-column owner indexes made redundant by the composites above
+SUPERSEDED = {
+    "ix_conversations_user": ("conversations", ["user_id"]),
+    "ix_notes_user": ("notes", ["user_id"]),
+}
+
+
+def upgrade() -> None:
+    # Build indexes outside the transaction so PostgreSQL can use CONCURRENTLY
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in INDEXES.items():
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+        for name, (table, _) in SUPERSEDED.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    for name, (table, columns) in SUPERSEDED.items():
+        op.create_index(name, table, columns)
+    for name, (table, _) in reversed(INDEXES.items()):
+        op.drop_index(name, table_name=table)
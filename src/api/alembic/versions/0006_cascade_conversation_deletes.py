@@ -0,0 +1,52 @@
+"""Cascade conversation deletes to messages, notes, tasks and tool runs
+
+Revision ID: 0006_cascade_conversation_deletes
+Revises: 0005_add_listing_indexes
+Create Date: 2025-10-02 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_cascade_conversation_deletes"
+down_revision = "0005_add_listing_indexes"
+branch_labels = None
+depends_on = None
+
+# Tables whose conversation_id references conversations.id; 0001 left the
+# constraints unnamed, so they carry PostgreSQL's default <table>_<column>_fkey names
+TABLES = ("messages", "notes", "tasks", "tool_runs")
+
+
+def _swap_foreign_keys(old_name, new_name, ondelete) -> None:
+    for table in TABLES:
+        op.drop_constraint(old_name(table), table, type_="foreignkey")
+        # NOT VALID skips the full-table check while holding the ALTER TABLE lock;
+        # the existing rows already satisfied the constraint being replaced
+        op.create_foreign_key(
+            new_name(table), table, "conversations", ["conversation_id"], ["id"],
+            ondelete=ondelete, postgresql_not_valid=True,
+        )
+
+    # Validating only takes a SHARE UPDATE EXCLUSIVE lock, so writes keep flowing
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for table in TABLES:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {new_name(table)}")
+
+
+def upgrade() -> None:
+    _swap_foreign_keys(
+        lambda table: f"{table}_conversation_id_fkey",
+        lambda table: f"fk_{table}_conversation_id",
+        "CASCADE",
+    )
+
+
+def downgrade() -> None:
+    _swap_foreign_keys(
+        lambda table: f"fk_{table}_conversation_id",
+        lambda table: f"{table}_conversation_id_fkey",
+        None,
+    )
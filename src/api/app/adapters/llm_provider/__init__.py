@@ -1,7 +1,8 @@
 from .base import LLMMessage, LLMProvider, LLMResponse
-from .ollama import OllamaProvider
+from .ollama import AsyncOllamaProvider, OllamaProvider
 
 __all__ = [
+    "AsyncOllamaProvider",
     "LLMMessage",
     "LLMProvider",
     "LLMResponse",
@@ -4,13 +4,13 @@ from dataclasses import dataclass
 from typing import Protocol, Sequence
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMMessage:
     role: str  # user | system | assistant
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     model_id: str
     content: str
@@ -24,6 +24,7 @@ class LLMProvider(Protocol):
         messages: Sequence[LLMMessage],
         temperature: float = 0.2,
         max_tokens: int | None = None,
+        format: str | None = None,
     ) -> LLMResponse:  # noqa: D401
         """Generate a completion given messages."""
         ...
@@ -2,15 +2,45 @@ from __future__ import annotations
 
 import time
 
+import httpx
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ...config.settings import settings
 from .base import LLMMessage, LLMResponse
 
+# Module-level session so keep-alive connections to Ollama are reused across calls
+_SESSION = requests.Session()
+_SESSION.mount(
+    "http://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    ),
+)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class OllamaProvider:
     def __init__(self, host: str | None = None) -> None:
         self.host = host or settings.ollama_host or "http://localhost:11434"
+        self._url = f"{self.host}/api/chat"
+        # (temperature, max_tokens) -> options dict; callers use a handful of fixed values
+        self._options: dict[tuple[float, int | None], dict] = {}
+
+    def _options_for(self, temperature: float, max_tokens: int | None) -> dict:
+        key = (temperature, max_tokens)
+        options = self._options.get(key)
+        if options is None:
+            options = {"temperature": temperature}
+            if max_tokens:
+                options["num_predict"] = max_tokens
+            self._options[key] = options
+        return options
 
     def generate(
         self,
@@ -18,21 +48,78 @@ class OllamaProvider:
         messages: list[LLMMessage],
         temperature: float = 0.2,
         max_tokens: int | None = None,
+        format: str | None = None,
+    ) -> LLMResponse:
+        payload = {
+            "model": model,
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "options": self._options_for(temperature, max_tokens),
+            "stream": False,
+        }
+        if format:
+            # e.g. "json": Ollama constrains decoding to that format
+            payload["format"] = format
+        t0 = time.time()
+        r = _SESSION.post(
+            self._url, data=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=60
+        )
+        r.raise_for_status()
+        data = orjson.loads(r.content)
+        content = data.get("message", {}).get("content", "")
+        latency_ms = int((time.time() - t0) * 1000)
+        return LLMResponse(model_id=model, content=content, latency_ms=latency_ms)
+
+
+class AsyncOllamaProvider(OllamaProvider):
+    """Non-blocking variant of :class:`OllamaProvider` for use on the event loop.
+
+    Requests overlap instead of queueing behind one another; how many Ollama
+    actually runs at once is governed by its ``OLLAMA_NUM_PARALLEL`` setting.
+    """
+
+    # Shared across instances so keep-alive connections survive between requests
+    _client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        client = cls._client
+        if client is None or client.is_closed:
+            client = cls._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+        return client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the shared HTTP client (called on application shutdown)."""
+        client, cls._client = cls._client, None
+        if client is not None:
+            await client.aclose()
+
+    async def generate(
+        self,
+        model: str,
+        messages: list[LLMMessage],
+        temperature: float = 0.2,
+        max_tokens: int | None = None,
+        format: str | None = None,
     ) -> LLMResponse:
-        url = f"{self.host}/api/chat"
         payload = {
             "model": model,
             "messages": [{"role": m.role, "content": m.content} for m in messages],
-            "options": {
-                "temperature": temperature,
-                **({"num_predict": max_tokens} if max_tokens else {}),
-            },
+            "options": self._options_for(temperature, max_tokens),
             "stream": False,
         }
+        if format:
+            # e.g. "json": Ollama constrains decoding to that format
+            payload["format"] = format
         t0 = time.time()
-        r = requests.post(url, json=payload, timeout=60)
+        r = await self._get_client().post(
+            self._url, content=orjson.dumps(payload), headers=_JSON_HEADERS
+        )
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         content = data.get("message", {}).get("content", "")
         latency_ms = int((time.time() - t0) * 1000)
         return LLMResponse(model_id=model, content=content, latency_ms=latency_ms)
@@ -3,17 +3,67 @@ Reasoning LLM Provider for complex tasks like classification and analysis.
 Supports various reasoning models including GPT-OSS, OpenAI, and local models.
 """
 
-import json
+import asyncio
 import logging
-from typing import Dict, Any, Optional, Literal
+import re
+from typing import Dict, Any, List, Optional, Literal
 import httpx
+import orjson
 from .base import LLMProvider
 
 logger = logging.getLogger(__name__)
 
+# JSON object optionally wrapped in a ```json fence
+_JSON_RE = re.compile(r"^\s*(?:```json)?\s*(\{.*\})\s*(?:```)?\s*$", re.S)
+# Same, for the JSON array returned by batch classification
+_JSON_ARRAY_RE = re.compile(r"^\s*(?:```json)?\s*(\[.*\])\s*(?:```)?\s*$", re.S)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+_VALID_CLASSIFICATIONS = frozenset({"BRAIN_DUMP", "SIMPLE_TASK", "SIMPLE_NOTE", "MESSAGE_ANALYSIS"})
+_REQUIRED_FIELDS = frozenset({"classification", "confidence", "reasoning"})
+# Everything static lives in the system prompt so it forms a byte-identical prefix
+# across calls (letting Ollama/OpenAI prompt caching skip its prefill); the user
+# turn carries only the message(s) to classify.
+_CLASSIFIER_SYSTEM_PROMPT = (
+    "You are an expert message classifier for a note-taking AI assistant. You analyze user "
+    "messages and categorize them with high accuracy. Always respond with valid JSON only.\n"
+    "\n"
+    "Categories:\n"
+    "1. BRAIN_DUMP: Long, complex messages with multiple ideas, tasks, or notes. Often meeting "
+    "notes, brainstorming sessions, or stream-of-consciousness thoughts with multiple actionable "
+    "items.\n"
+    "2. SIMPLE_TASK: Clear requests to create a task, todo item, or action item. Usually contains "
+    "action verbs and specific things to be done.\n"
+    "3. SIMPLE_NOTE: Thoughts, ideas, or information to remember. Often starts with \"I'm "
+    'thinking", "Remember", or contains project ideas, observations, or notes.\n'
+    "4. MESSAGE_ANALYSIS: General questions, requests for help, or messages that need analysis but "
+    "don't clearly fit the other categories.\n"
+    "\n"
+    "For a single message, respond with one JSON object:\n"
+    '{"classification": "SIMPLE_TASK", "confidence": 0.8, "reasoning": "Brief explanation"}\n'
+    "\n"
+    "For a numbered list of messages, respond with a JSON array holding one such object per "
+    'message, in the same order, each with an "index" field set to that message\'s number.'
+)
+# Completion budget per message when several are classified in one call
+_BATCH_TOKENS_PER_MESSAGE = 100
+
+
+def _check_classification(result: Any) -> None:
+    """Raise ValueError unless ``result`` is a complete, valid classification object."""
+    if not isinstance(result, dict) or not _REQUIRED_FIELDS <= result.keys():
+        raise ValueError("Missing required fields in response")
+    if result["classification"] not in _VALID_CLASSIFICATIONS:
+        raise ValueError(f"Invalid classification: {result['classification']}")
+
+
 class ReasoningLLMProvider(LLMProvider):
     """Enhanced LLM provider optimized for reasoning tasks."""
-    
+
+    # Shared across instances (one per provider type) so keep-alive connections
+    # survive between requests
+    _clients: Dict[str, httpx.AsyncClient] = {}
+
     def __init__(
         self, 
         provider_type: Literal["openai", "ollama"] = "ollama",
@@ -29,16 +79,51 @@ class ReasoningLLMProvider(LLMProvider):
         self.api_key = api_key
         self.temperature = temperature
         self.max_tokens = max_tokens
-        
-    async def generate_response(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+
+        # Request pieces that don't change between calls
+        self._url = f"{host}/api/chat"
+        self._base_options = {"temperature": temperature, "num_predict": max_tokens}
+        self._openai_headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client for this provider type, creating it on first use."""
+        client = self._clients.get(self.provider_type)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=100, max_keepalive_connections=32, keepalive_expiry=30.0
+                ),
+                # HTTP/2 multiplexing pays off over TLS to OpenAI; local Ollama speaks HTTP/1.1
+                http2=self.provider_type == "openai",
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+            self._clients[self.provider_type] = client
+        return client
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the shared HTTP clients (called on application shutdown)."""
+        clients = list(cls._clients.values())
+        cls._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    async def generate_response(
+        self, prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None
+    ) -> str:
         """Generate a response optimized for reasoning tasks."""
         
         if self.provider_type == "openai":
-            return await self._openai_generate(prompt, system_prompt)
+            return await self._openai_generate(prompt, system_prompt, max_tokens)
         else:  # ollama (including gpt-oss model)
-            return await self._ollama_generate(prompt, system_prompt)
+            return await self._ollama_generate(prompt, system_prompt, max_tokens)
     
-    async def _openai_generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    async def _openai_generate(
+        self, prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None
+    ) -> str:
         """Generate using OpenAI API."""
         if not self.api_key:
             raise ValueError("OpenAI API key required")
@@ -48,88 +133,70 @@ class ReasoningLLMProvider(LLMProvider):
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
+        client = await self._get_client()
+        response = await client.post(
+            _OPENAI_CHAT_URL,
+            headers=self._openai_headers,
+            content=orjson.dumps({
+                "model": self.model,
+                "messages": messages,
+                "temperature": self.temperature,
+                "max_tokens": max_tokens or self.max_tokens
+            }),
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)["choices"][0]["message"]["content"]
     
     
-    async def _ollama_generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    async def _ollama_generate(
+        self, prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None
+    ) -> str:
         """Generate using Ollama (fallback)."""
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
             
-        async with httpx.AsyncClient() as client:
-            url = f"{self.host}/api/chat"
-            payload = {
-                "model": self.model,
-                "messages": messages,
-                "stream": False,
-                "options": {
-                    "temperature": self.temperature,
-                    "num_predict": self.max_tokens
-                }
-            }
-            logger.info(f"Calling Ollama at {url} with model: {payload['model']}")
-            response = await client.post(url, json=payload, timeout=60.0)
-            logger.info(f"Ollama response status: {response.status_code}")
-            if response.status_code != 200:
-                logger.error(f"Ollama error response: {response.text}")
-            response.raise_for_status()
-            return response.json()["message"]["content"]
+        client = await self._get_client()
+        url = self._url
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": False,
+            "options": (
+                {**self._base_options, "num_predict": max_tokens}
+                if max_tokens
+                else self._base_options
+            ),
+        }
+        logger.info(f"Calling Ollama at {url} with model: {payload['model']}")
+        response = await client.post(
+            url, content=orjson.dumps(payload), headers=_JSON_HEADERS, timeout=60.0
+        )
+        logger.info(f"Ollama response status: {response.status_code}")
+        if response.status_code != 200:
+            logger.error(f"Ollama error response: {response.text}")
+        response.raise_for_status()
+        return orjson.loads(response.content)["message"]["content"]
 
     async def classify_message(self, message: str) -> Dict[str, Any]:
         """
         Specialized method for message classification with structured output.
         """
-        system_prompt = """You are an expert message classifier. You analyze user messages and categorize them with high accuracy. Always respond with valid JSON only."""
+        system_prompt = _CLASSIFIER_SYSTEM_PROMPT
         
-        classification_prompt = f"""Classify this message: "{message}"
-
-Choose one: BRAIN_DUMP, SIMPLE_TASK, SIMPLE_NOTE, or MESSAGE_ANALYSIS.
-
-Respond with JSON:
-{{"classification": "SIMPLE_TASK", "confidence": 0.8, "reasoning": "test"}}"""
+        classification_prompt = f'Classify this message: "{message}"'
         
         try:
             response = await self.generate_response(classification_prompt, system_prompt)
             
-            # Clean up the response to extract JSON
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
+            # Extract the JSON object (dropping any code fence) and parse it
+            match = _JSON_RE.match(response)
+            result = orjson.loads(match.group(1) if match else response)
             
-            # Parse JSON response
-            result = json.loads(response)
-            
-            # Validate required fields
-            required_fields = ["classification", "confidence", "reasoning"]
-            if not all(field in result for field in required_fields):
-                raise ValueError("Missing required fields in response")
-                
-            # Validate classification value
-            valid_classifications = ["BRAIN_DUMP", "SIMPLE_TASK", "SIMPLE_NOTE", "MESSAGE_ANALYSIS"]
-            if result["classification"] not in valid_classifications:
-                raise ValueError(f"Invalid classification: {result['classification']}")
-                
+            # Validate required fields and the classification value
+            _check_classification(result)
             return result
             
         except Exception as e:
@@ -142,3 +209,39 @@ Respond with JSON:
                 "confidence": 0.3,
                 "reasoning": f"Classification failed, using fallback: {str(e)}"
             }
+
+    async def classify_batch(self, messages: List[str]) -> List[Dict[str, Any]]:
+        """
+        Classify several messages with a single completion, falling back to
+        per-message calls when the batched answer can't be used.
+        """
+        if len(messages) == 1:
+            return [await self.classify_message(messages[0])]
+        
+        # Messages from different users share this prompt and results are matched back by
+        # position, so each one is JSON-escaped: embedded quotes or newlines can't open a
+        # new numbered entry and shift or forge another user's result
+        numbered = "\n".join(
+            f"{i}. {orjson.dumps(message).decode()}" for i, message in enumerate(messages, 1)
+        )
+        batch_prompt = f"Classify each of these {len(messages)} messages:\n{numbered}"
+        
+        try:
+            response = await self.generate_response(
+                batch_prompt,
+                _CLASSIFIER_SYSTEM_PROMPT,
+                max_tokens=_BATCH_TOKENS_PER_MESSAGE * len(messages),
+            )
+            match = _JSON_ARRAY_RE.match(response)
+            results = orjson.loads(match.group(1) if match else response)
+            if not isinstance(results, list) or len(results) != len(messages):
+                raise ValueError("Batch response does not match the number of messages")
+            for i, result in enumerate(results, 1):
+                _check_classification(result)
+                index = result.pop("index", None)
+                if index != i:
+                    raise ValueError(f"Batch result {i} is labelled {index!r}")
+            return results
+        except Exception as e:
+            logger.warning(f"Batch classification failed, classifying individually: {e}")
+            return list(await asyncio.gather(*map(self.classify_message, messages)))
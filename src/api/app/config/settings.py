@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +9,24 @@ class Settings(BaseSettings):
     port: int = 8000
     # Provide a safe default for tests/local without envs (file-based sqlite)
     database_url: str = "postgresql+psycopg://note_user:note_pass@db:5432/note_db"
+    # Connection pool tuning (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...)
+    # Set DATABASE_PGBOUNCER_MODE=transaction when connecting through PgBouncer in
+    # transaction pooling mode; pre-ping/recycle then default to PgBouncer-friendly values.
+    database_pgbouncer_mode: Optional[Literal["session", "transaction"]] = None
+    # Size the pool to the concurrency that can hold a session at once: roughly the
+    # threadpool size (40 by default) per uvicorn worker. Note the sync and async
+    # engines each keep their own pool, so the per-worker ceiling is twice this.
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: Optional[int] = None
+    db_pool_pre_ping: Optional[bool] = None
+    # Alembic owns the schema; enable only for throwaway/dev databases without migrations
+    auto_create_schema: bool = False
+    # "async" seeds default rows in the background so startup doesn't wait on the DB
+    migration_mode: Literal["sync", "async"] = "async"
+    # Share rate-limit windows across workers (requires the redis extra)
+    rate_limit_redis_url: Optional[str] = None
     ollama_host: str = "http://ollama:11434"
     ollama_model: str = "llama3.2:1b"
 
@@ -1,13 +1,101 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+from typing import AsyncIterator
+
+from sqlalchemy import Insert, create_engine, event, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from .config.settings import settings
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+def _engine_options(database_url: str) -> dict:
+    """Build connection pool options for ``database_url`` from settings."""
+    pgbouncer_transaction = settings.database_pgbouncer_mode == "transaction"
+    pre_ping = settings.db_pool_pre_ping
+    if pre_ping is None:
+        # The pre-ping SELECT 1 leaves backends idle in transaction under PgBouncer
+        pre_ping = not pgbouncer_transaction
+    options: dict = {"pool_pre_ping": pre_ping}
+
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        # SQLite (tests/local) uses its own pool classes without sizing arguments. An
+        # in-memory database exists only inside its connection, so pin a single one
+        if url.database in (None, "", ":memory:") or url.query.get("mode") == "memory":
+            options.update(poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        recycle = settings.db_pool_recycle
+        if recycle is None:
+            # Recycle hourly, ahead of typical server/firewall idle timeouts. PgBouncer
+            # transaction mode runs without pre-ping, so stale connections would only
+            # surface as query errors; recycle those after a minute instead
+            recycle = 60 if pgbouncer_transaction else 3600
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=recycle,
+        )
+    return options
+
+
+def _async_url(url: str) -> str:
+    """Swap the sync driver for its asyncio counterpart (psycopg serves both)."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    # SQLite ignores foreign keys (and so ON DELETE CASCADE) unless asked per connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def make_engine(database_url: str) -> Engine:
+    """Create a sync engine for ``database_url`` with the app's pool and SQLite setup."""
+    new_engine = create_engine(database_url, **_engine_options(database_url))
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", _enable_sqlite_foreign_keys)
+    return new_engine
+
+
+def make_async_engine(database_url: str) -> AsyncEngine:
+    """Async counterpart of ``make_engine``; takes the sync URL and swaps the driver."""
+    new_engine = create_async_engine(_async_url(database_url), **_engine_options(database_url))
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+    return new_engine
+
+
+engine = make_engine(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
+# Used by request handlers that run on the event loop; sync code keeps SessionLocal
+async_engine = make_async_engine(settings.database_url)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def insert_ignore(model) -> Insert:
+    """INSERT for ``model`` that skips rows hitting a unique constraint (ON CONFLICT DO NOTHING)."""
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
 
 def get_db() -> Session:
     session: Session = SessionLocal()
@@ -19,3 +107,13 @@ def get_db() -> Session:
         raise
     finally:
         session.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
@@ -1,54 +1,88 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .adapters.llm_provider import AsyncOllamaProvider
+from .adapters.llm_provider.reasoning import ReasoningLLMProvider
 from .config.settings import settings
-from .db import engine
+from .db import async_engine, engine
 from .middleware.idempotency import IdempotencyMiddleware
 from .middleware.enhanced_rate_limit import EnhancedRateLimitMiddleware, RateLimitConfig
 from .middleware.telemetry import TelemetryMiddleware
 from .models.orm import Base
+from .pagination import NEXT_CURSOR_HEADER
 from .routes.conversations import router as conversations_router
-from .routes.health import router as health_router
+from .routes.health import aclose_ollama_client, router as health_router
 from .routes.messages import router as messages_router
 from .routes.notes import router as notes_router
 from .routes.tasks import router as tasks_router
 from .routes.categories import router as categories_router
-from .routes.classification import router as classification_router
+from .routes.classification import aclose_classify_batchers, router as classification_router
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     import os
-    
-    # Skip lifespan setup during testing
-    if os.getenv("TESTING"):
-        yield
-        return
-        
-    from .db import SessionLocal
+
+    seed_task = None
+
+    # Skip startup setup during testing
+    if not os.getenv("TESTING"):
+        if settings.auto_create_schema:
+            try:
+                Base.metadata.create_all(bind=engine)
+            except Exception:
+                pass
+
+        if settings.migration_mode == "async":
+            # Don't hold up startup on default-row seeding
+            seed_task = asyncio.create_task(asyncio.to_thread(_seed_defaults))
+        else:
+            _seed_defaults()
+
+    yield
+
+    if seed_task is not None and not seed_task.done():
+        seed_task.cancel()
+
+    # Stop classification batching, then release pooled keep-alive connections
+    # held by the LLM providers
+    await aclose_classify_batchers()
+    await ReasoningLLMProvider.aclose()
+    await AsyncOllamaProvider.aclose()
+    await aclose_ollama_client()
+    await async_engine.dispose()
+
+
+def _seed_defaults() -> None:
+    from sqlalchemy import exists, literal, select
+
+    from .db import SessionLocal, insert_ignore
     from .models.orm import Conversation, User
 
     try:
-        Base.metadata.create_all(bind=engine)
-
-        # Create default user and conversation if they don't exist
+        # Create default user and conversation if they don't exist, in one transaction.
+        # Ids are left to the sequence so later inserts don't collide with id 1.
         with SessionLocal() as db:
-            existing_user = db.query(User).filter(User.id == 1).first()
-            if not existing_user:
-                default_user = User(email="default@example.com")
-                db.add(default_user)
-                db.commit()
-
-            existing_conversation = db.query(Conversation).filter(Conversation.id == 1).first()
-            if not existing_conversation:
-                default_conversation = Conversation(user_id=1, title="Default Conversation")
-                db.add(default_conversation)
-                db.commit()
+            db.execute(
+                insert_ignore(User).from_select(
+                    ["email"],
+                    select(literal("default@example.com")).where(~exists().where(User.id == 1)),
+                )
+            )
+            db.execute(
+                insert_ignore(Conversation).from_select(
+                    ["user_id", "title"],
+                    select(literal(1), literal("Default Conversation")).where(
+                        ~exists().where(Conversation.id == 1)
+                    ),
+                )
+            )
+            db.commit()
     except Exception:
         pass
-    yield
 
 
 app = FastAPI(title="Note-Taker API", version="0.1.0", lifespan=lifespan)
@@ -60,6 +94,8 @@ app.add_middleware(
     allow_credentials=False,  # Disable credentials for broader compatibility
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=[NEXT_CURSOR_HEADER],  # Keyset pagination cursor for list endpoints
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # Re-enable other middleware now that CORS is configured
@@ -77,6 +113,7 @@ app.add_middleware(
     EnhancedRateLimitMiddleware,  # Apply rate limiting
     default_config=RateLimitConfig(limit=30, window_seconds=60),  # Default: 30 requests/min
     endpoint_configs=endpoint_configs,
+    redis_url=settings.rate_limit_redis_url,
 )
 
 app.include_router(health_router)  # Comprehensive health at /api/health and /api/health/ready
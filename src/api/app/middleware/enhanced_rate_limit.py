@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+import os
+import re
 import time
-from collections import defaultdict, deque
-from typing import Deque, Dict, Optional, Tuple
-from dataclasses import dataclass
+from array import array
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 import asyncio
+import contextlib
 
-from fastapi import Request, HTTPException
+from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 
+# Clock for every window computation; tests monkeypatch it to control time
+_now = time.time
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class RateLimitConfig:
     """Configuration for rate limiting rules."""
     limit: int = 10
@@ -18,6 +26,66 @@ class RateLimitConfig:
     burst_limit: Optional[int] = None  # Allow short bursts
     cleanup_interval: int = 300  # Cleanup old buckets every 5 minutes
 
+    # Header values derived from the fields above, encoded once
+    limit_b: bytes = field(init=False, repr=False, compare=False)
+    window_b: bytes = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "limit_b", str(self.limit).encode())
+        object.__setattr__(self, "window_b", str(self.window_seconds).encode())
+
+
+# POST paths whose requests share one bucket per resource type
+_POST_ROUTES = re.compile(rb"/(messages|notes|tasks)")
+_POST_KEYS = {b"messages": "messages:post", b"notes": "notes:post", b"tasks": "tasks:post"}
+
+# Sliding window as a sorted set scored by timestamp; one roundtrip per request.
+# Returns {allowed, count_in_window, oldest_timestamp}; the timestamp is a string
+# because Redis truncates Lua numbers to integers.
+_SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', '(' .. (now - window))
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', key, math.ceil(window * 1000))
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {allowed, count, oldest[2] or ARGV[1]}
+"""
+
+
+class Bucket:
+    """Fixed-size ring buffer of request timestamps for one (user, endpoint) pair."""
+
+    __slots__ = ("buf", "head", "count")
+
+    def __init__(self, size: int) -> None:
+        self.buf = array("d", [0.0]) * size
+        self.head = 0  # index of the oldest timestamp
+        self.count = 0
+
+    def evict_before(self, cutoff: float) -> None:
+        """Drop timestamps older than ``cutoff`` from the front of the buffer."""
+        buf, size = self.buf, len(self.buf)
+        while self.count and buf[self.head] < cutoff:
+            self.head = (self.head + 1) % size
+            self.count -= 1
+
+    def oldest(self) -> float:
+        return self.buf[self.head]
+
+    def push(self, timestamp: float) -> None:
+        """Append a timestamp; the caller ensures the buffer isn't full."""
+        self.buf[(self.head + self.count) % len(self.buf)] = timestamp
+        self.count += 1
+
 
 class EnhancedRateLimitMiddleware:
     """
@@ -31,6 +99,8 @@ class EnhancedRateLimitMiddleware:
     - Burst protection
     """
 
+    _ROUTE_CACHE_MAX = 4096
+
     def __init__(
         self,
         app,
@@ -38,115 +108,145 @@ class EnhancedRateLimitMiddleware:
         endpoint_configs: Optional[Dict[str, RateLimitConfig]] = None,
         header_name: str = "X-User-Id",
         enable_cleanup: bool = True,
+        redis_url: Optional[str] = None,
     ) -> None:
         self.app = app
         self.default_config = default_config or RateLimitConfig()
         self.endpoint_configs = endpoint_configs or {}
+        self._config_get = self.endpoint_configs.get
         self.header_name = header_name
+        # ASGI header names are lowercase bytes
+        self._header_key = header_name.lower().encode("latin-1")
         
-        # Storage: user_key -> endpoint -> deque of timestamps
-        self._buckets: Dict[str, Dict[str, Deque[float]]] = defaultdict(
-            lambda: defaultdict(deque)
-        )
-        self._last_cleanup = time.time()
+        # Storage: user_key -> endpoint -> ring buffer of timestamps
+        self._buckets: Dict[str, Dict[str, Bucket]] = {}
+        # Last request time per user, plus a min-heap of (activity_ts, user_key) with
+        # one entry per user; heap timestamps may be stale and are refreshed lazily
+        self._last_seen: Dict[str, float] = {}
+        self._activity_heap: List[Tuple[float, str]] = []
         self.enable_cleanup = enable_cleanup
+        self._cleanup_task: Optional[asyncio.Task] = None
 
-    def _get_config_for_endpoint(self, endpoint: str) -> RateLimitConfig:
-        """Get rate limit configuration for a specific endpoint."""
-        return self.endpoint_configs.get(endpoint, self.default_config)
+        # Shared state across workers when Redis is configured; in-memory buckets
+        # remain the default and the fallback if Redis is unreachable
+        self._redis_script = None
+        if redis_url:
+            import redis.asyncio as redis
 
-    def _get_user_key(self, request: Request) -> str:
-        """Extract user identifier from request."""
-        return (
-            request.headers.get(self.header_name) 
-            or request.client.host 
-            or "anonymous"
-        )
+            client = redis.Redis.from_url(redis_url)
+            self._redis_script = client.register_script(_SLIDING_WINDOW_LUA)
+            self._redis_error = redis.RedisError
+            self._member_seq = itertools.count()
+
+        # (method, raw path) -> (endpoint_key, config), so repeat paths skip classification
+        self._route_cache: Dict[Tuple[str, bytes], Tuple[str, RateLimitConfig]] = {}
 
-    def _get_endpoint_key(self, request: Request) -> str:
+    def _get_user_key(self, headers: list, client: Optional[Tuple[str, int]]) -> str:
+        """Extract user identifier from the raw ASGI headers and client address."""
+        header_key = self._header_key
+        for name, value in headers:
+            if name == header_key and value:
+                return value.decode("latin-1")
+        return (client[0] if client else None) or "anonymous"
+
+    def _get_endpoint_key(self, method: str, path: bytes) -> str:
         """Generate endpoint key for rate limiting."""
         # Group similar endpoints (e.g., all message posts)
-        path = request.url.path
-        method = request.method
-        
-        if method == "POST" and "/messages" in path:
-            return "messages:post"
-        elif method == "POST" and "/notes" in path:
-            return "notes:post"
-        elif method == "POST" and "/tasks" in path:
-            return "tasks:post"
-        else:
-            return f"{method.lower()}:{path}"
+        if method == "POST":
+            match = _POST_ROUTES.search(path)
+            if match:
+                return _POST_KEYS[match.group(1)]
+        return f"{method.lower()}:{path.decode('latin-1')}"
 
     def _cleanup_old_buckets(self) -> None:
         """Remove old, inactive user buckets to prevent memory leaks."""
-        now = time.time()
-        if now - self._last_cleanup < self.default_config.cleanup_interval:
-            return
-
+        now = _now()
         cutoff_time = now - (self.default_config.window_seconds * 2)  # Keep 2x window
-        users_to_remove = []
-
-        for user_key, user_buckets in self._buckets.items():
-            endpoints_to_remove = []
-            
-            for endpoint_key, bucket in user_buckets.items():
-                # Remove old entries from bucket
-                while bucket and bucket[0] < cutoff_time:
-                    bucket.popleft()
-                
-                # Mark empty buckets for removal
-                if not bucket:
-                    endpoints_to_remove.append(endpoint_key)
-            
-            # Remove empty endpoint buckets
-            for endpoint_key in endpoints_to_remove:
-                del user_buckets[endpoint_key]
-            
-            # Mark users with no active endpoints for removal
-            if not user_buckets:
-                users_to_remove.append(user_key)
-
-        # Remove inactive users
-        for user_key in users_to_remove:
-            del self._buckets[user_key]
-
-        self._last_cleanup = now
+        heap = self._activity_heap
+        last_seen = self._last_seen
+
+        # Only users whose heap entry predates the cutoff are visited
+        while heap and heap[0][0] < cutoff_time:
+            _, user_key = heapq.heappop(heap)
+            seen = last_seen[user_key]
+            if seen < cutoff_time:
+                # Every timestamp in the user's buckets is older than the cutoff
+                del last_seen[user_key]
+                del self._buckets[user_key]
+            else:
+                heapq.heappush(heap, (seen, user_key))
+
+    def reset(self) -> None:
+        """Forget every in-memory bucket (Redis-backed counters are left alone)."""
+        self._buckets.clear()
+        self._last_seen.clear()
+        self._activity_heap.clear()
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.default_config.cleanup_interval)
+            self._cleanup_old_buckets()
+
+    async def start(self) -> None:
+        """Start the periodic cleanup task (needs a running event loop)."""
+        if self.enable_cleanup and self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def stop(self) -> None:
+        """Cancel the periodic cleanup task."""
+        task, self._cleanup_task = self._cleanup_task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
 
     def _check_rate_limit(
-        self, user_key: str, endpoint_key: str, config: RateLimitConfig
+        self, user_key: str, endpoint_key: str, config: RateLimitConfig, now: float
     ) -> Tuple[bool, int, float]:
         """
         Check if request should be rate limited.
         
         Returns:
-            (is_allowed, remaining_requests, reset_time)
+            (is_allowed, remaining_requests, window_start) where window_start is the
+            oldest timestamp still in the window; the reset time is window_start plus
+            the window and is only computed when headers are emitted.
+
+        Must stay free of awaits: the read-modify-write on the bucket is only safe
+        without a lock because coroutines can't interleave inside it.
         """
-        now = time.time()
-        bucket = self._buckets[user_key][endpoint_key]
+        user_buckets = self._buckets.get(user_key)
+        if user_buckets is None:
+            user_buckets = self._buckets[user_key] = {}
+            heapq.heappush(self._activity_heap, (now, user_key))
+        self._last_seen[user_key] = now
+        bucket = user_buckets.get(endpoint_key)
+        if bucket is None:
+            bucket = user_buckets[endpoint_key] = Bucket(config.limit)
         
         # Remove old entries outside the window
-        cutoff = now - config.window_seconds
-        while bucket and bucket[0] < cutoff:
-            bucket.popleft()
+        bucket.evict_before(now - config.window_seconds)
 
         # Check if we're over the limit
-        current_count = len(bucket)
-        is_allowed = current_count < config.limit
-        remaining = max(0, config.limit - current_count)
-        
-        # Calculate reset time (when the oldest request in window expires)
-        if bucket:
-            reset_time = bucket[0] + config.window_seconds
-        else:
-            reset_time = now + config.window_seconds
+        current_count = bucket.count
+        if current_count >= config.limit:
+            return False, 0, bucket.oldest()
 
-        # Add current request if allowed
-        if is_allowed:
-            bucket.append(now)
-            remaining -= 1  # Account for the request we just added
+        # Add current request (the bucket is non-empty afterwards)
+        bucket.push(now)
+        return True, config.limit - current_count - 1, bucket.oldest()
 
-        return is_allowed, remaining, reset_time
+    async def _check_rate_limit_redis(
+        self, user_key: str, endpoint_key: str, config: RateLimitConfig, now: float
+    ) -> Tuple[bool, int, float]:
+        """Redis-backed equivalent of ``_check_rate_limit``."""
+        # Members must be unique per request, including across workers
+        member = f"{now!r}:{os.getpid()}:{next(self._member_seq)}"
+        allowed, count, oldest = await self._redis_script(
+            keys=[f"ratelimit:{user_key}:{endpoint_key}"],
+            args=[now, config.window_seconds, config.limit, member],
+        )
+        remaining = max(0, config.limit - int(count))
+        return bool(allowed), remaining, float(oldest)
 
     def _create_rate_limit_response(
         self, config: RateLimitConfig, remaining: int, reset_time: float
@@ -157,7 +257,7 @@ class EnhancedRateLimitMiddleware:
             "X-RateLimit-Remaining": "0",
             "X-RateLimit-Reset": str(int(reset_time)),
             "X-RateLimit-Window": str(config.window_seconds),
-            "Retry-After": str(int(reset_time - time.time())),
+            "Retry-After": str(int(reset_time - _now())),
         }
         
         return JSONResponse(
@@ -166,7 +266,7 @@ class EnhancedRateLimitMiddleware:
                 "detail": "Rate limit exceeded",
                 "limit": config.limit,
                 "window_seconds": config.window_seconds,
-                "retry_after": int(reset_time - time.time()),
+                "retry_after": int(reset_time - _now()),
             },
             headers=headers,
         )
@@ -176,45 +276,83 @@ class EnhancedRateLimitMiddleware:
     ) -> None:
         """Add rate limit headers to successful responses."""
         headers.extend([
-            (b"x-ratelimit-limit", str(config.limit).encode()),
+            (b"x-ratelimit-limit", config.limit_b),
             (b"x-ratelimit-remaining", str(remaining).encode()),
             (b"x-ratelimit-reset", str(int(reset_time)).encode()),
-            (b"x-ratelimit-window", str(config.window_seconds).encode()),
+            (b"x-ratelimit-window", config.window_b),
         ])
 
+    async def _lifespan(self, scope, receive, send) -> None:
+        """Pass lifespan events through, tying the cleanup task to app startup/shutdown."""
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "lifespan.shutdown":
+                await self.stop()
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "lifespan.startup.complete":
+                await self.start()
+            await send(message)
+
+        await self.app(scope, receive_wrapper, send_wrapper)
+
     async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(scope, receive, send)
+            return
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive)
-        user_key = self._get_user_key(request)
-        endpoint_key = self._get_endpoint_key(request)
-        config = self._get_config_for_endpoint(endpoint_key)
-
-        # Periodic cleanup
-        if self.enable_cleanup:
-            self._cleanup_old_buckets()
+        method = scope["method"]
+        user_key = self._get_user_key(scope["headers"], scope.get("client"))
+        raw_path = scope.get("raw_path") or scope["path"].encode()
+        route = (method, raw_path)
+        cached = self._route_cache.get(route)
+        if cached is None:
+            endpoint_key = self._get_endpoint_key(method, raw_path)
+            cached = (endpoint_key, self._config_get(endpoint_key, self.default_config))
+            # Path params (conversation ids) make the key space unbounded
+            if len(self._route_cache) >= self._ROUTE_CACHE_MAX:
+                self._route_cache.clear()
+            self._route_cache[route] = cached
+        endpoint_key, config = cached
 
         # Check rate limit
-        is_allowed, remaining, reset_time = self._check_rate_limit(
-            user_key, endpoint_key, config
-        )
+        now = _now()
+        if self._redis_script is not None:
+            try:
+                is_allowed, remaining, window_start = await self._check_rate_limit_redis(
+                    user_key, endpoint_key, config, now
+                )
+            except self._redis_error:
+                is_allowed, remaining, window_start = self._check_rate_limit(
+                    user_key, endpoint_key, config, now
+                )
+        else:
+            is_allowed, remaining, window_start = self._check_rate_limit(
+                user_key, endpoint_key, config, now
+            )
 
         if not is_allowed:
             # Rate limit exceeded
-            response = self._create_rate_limit_response(config, remaining, reset_time)
+            response = self._create_rate_limit_response(
+                config, remaining, window_start + config.window_seconds
+            )
             await response(scope, receive, send)
             return
 
         # Intercept response to add rate limit headers
-        response_headers = []
 
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
                 # Add rate limit headers to successful responses
                 headers = list(message.get("headers", []))
-                self._add_rate_limit_headers(headers, config, remaining, reset_time)
+                self._add_rate_limit_headers(
+                    headers, config, remaining, window_start + config.window_seconds
+                )
                 message = {**message, "headers": headers}
             await send(message)
 
@@ -1,41 +1,94 @@
 from __future__ import annotations
 
-import hashlib
-from typing import Callable
+import asyncio
+import time
+from collections import OrderedDict
 
-from fastapi import Request
+_Headers = list[tuple[bytes, bytes]]
+# (expires_at, status, body, headers)
+_Entry = tuple[float, int, bytes, _Headers]
 
 
 class IdempotencyMiddleware:
-    def __init__(self, app, header_name: str = "Idempotency-Key") -> None:
+    def __init__(
+        self,
+        app,
+        header_name: str = "Idempotency-Key",
+        maxsize: int = 1024,
+        ttl_seconds: float = 3600,
+    ) -> None:
         self.app = app
         self.header_name = header_name
-        self.cache: dict[str, tuple[int, bytes, list[tuple[bytes, bytes]]]] = {}
+        # ASGI header names are lowercase bytes
+        self._header_key = header_name.lower().encode("latin-1")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # LRU of (path, key) -> (expires_at, status, body, headers); oldest entries first
+        self.cache: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        # Fingerprints whose first request is still running; retries wait on the event
+        self._inflight: dict[tuple[str, str], asyncio.Event] = {}
+
+    def _get(self, fingerprint: tuple[str, str]) -> tuple[int, bytes, _Headers] | None:
+        entry = self.cache.get(fingerprint)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.cache[fingerprint]
+            return None
+        self.cache.move_to_end(fingerprint)
+        return entry[1:]
+
+    def _put(
+        self, fingerprint: tuple[str, str], status: int, body: bytes, headers: _Headers
+    ) -> None:
+        self.cache[fingerprint] = (time.monotonic() + self.ttl_seconds, status, body, headers)
+        self.cache.move_to_end(fingerprint)
+        while len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self.cache.clear()
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
-        request = Request(scope, receive)
-        key = request.headers.get(self.header_name)
+        key = None
+        header_key = self._header_key
+        for name, value in scope["headers"]:
+            if name == header_key:
+                key = value.decode("latin-1")
+                break
         if not key:
             await self.app(scope, receive, send)
             return
-        fingerprint = hashlib.sha256((request.url.path + "|" + key).encode()).hexdigest()
-        if fingerprint in self.cache:
-            status, body, headers = self.cache[fingerprint]
-
-            async def responder(send_callable: Callable):
-                await send_callable(
-                    {"type": "http.response.start", "status": status, "headers": headers}
-                )
-                await send_callable(
-                    {"type": "http.response.body", "body": body, "more_body": False}
-                )
-
-            await responder(send)
-            return
+        # Only used as an in-process dict key, so the tuple itself is the fingerprint
+        fingerprint = (scope["path"], key)
+        # The cache lookup and in-flight registration below never await, so they run
+        # atomically on the event loop; only a retry of the same key waits, for the
+        # first response, and unrelated keys never queue behind each other's handlers
+        while True:
+            cached = self._get(fingerprint)
+            if cached is not None:
+                status, body, headers = cached
+                await send({"type": "http.response.start", "status": status, "headers": headers})
+                await send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+            pending = self._inflight.get(fingerprint)
+            if pending is None:
+                break
+            # If the first request fails without a response to store, loop and run it
+            await pending.wait()
+
+        done = self._inflight[fingerprint] = asyncio.Event()
+        try:
+            await self._handle(fingerprint, scope, receive, send)
+        finally:
+            del self._inflight[fingerprint]
+            done.set()
 
+    async def _handle(self, fingerprint: tuple[str, str], scope, receive, send) -> None:
         captured: dict[str, object] = {}
 
         async def send_wrapper(message):
@@ -48,7 +101,8 @@ class IdempotencyMiddleware:
 
         await self.app(scope, receive, send_wrapper)
         if "status" in captured and "body" in captured:
-            self.cache[fingerprint] = (
+            self._put(
+                fingerprint,
                 int(captured["status"]),
                 bytes(captured["body"]),
                 list(captured.get("headers", [])),
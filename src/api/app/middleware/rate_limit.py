@@ -1,13 +1,11 @@
 from __future__ import annotations
 
 import time
-from collections import deque
-from typing import Deque
-
-from fastapi import Request
 
 
 class SimpleRateLimitMiddleware:
+    _SWEEP_EVERY = 1024  # calls between sweeps of idle buckets
+
     def __init__(
         self, app, limit: int = 10, window_seconds: int = 60, header_name: str = "X-User-Id"
     ) -> None:
@@ -15,23 +13,53 @@ class SimpleRateLimitMiddleware:
         self.limit = limit
         self.window = window_seconds
         self.header_name = header_name
-        self._buckets: dict[str, Deque[float]] = {}
+        # ASGI header names are lowercase bytes
+        self._header_key = header_name.lower().encode("latin-1")
+        # Token bucket per user: [tokens, last_refill]; refills limit tokens per window
+        self._rate = limit / window_seconds
+        self._buckets: dict[str, list[float]] = {}
+        self._calls = 0
+
+    def _sweep(self, now: float) -> None:
+        """Drop buckets that have refilled completely; they carry no state."""
+        cutoff = now - self.window
+        idle = [key for key, (_, last) in self._buckets.items() if last <= cutoff]
+        for key in idle:
+            del self._buckets[key]
+
+    def _admit(self, user_key: str, now: float) -> bool:
+        # Deliberately synchronous: with no await between reading and updating the
+        # bucket, coroutines on the event loop can't interleave here, so no lock is needed
+        bucket = self._buckets.get(user_key)
+        if bucket is None:
+            self._buckets[user_key] = [self.limit - 1, now]
+            return True
+        bucket[0] = min(self.limit, bucket[0] + (now - bucket[1]) * self._rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
-        request = Request(scope, receive)
         # Only rate-limit message posts for now
-        if request.method == "POST" and request.url.path.endswith("/messages"):
-            user_key = request.headers.get(self.header_name) or request.client.host or "anon"
-            now = time.time()
-            bucket = self._buckets.setdefault(user_key, deque())
-            # Evict old
-            cutoff = now - self.window
-            while bucket and bucket[0] < cutoff:
-                bucket.popleft()
-            if len(bucket) >= self.limit:
+        if scope["method"] == "POST" and scope["path"].endswith("/messages"):
+            user_key = None
+            header_key = self._header_key
+            for name, value in scope["headers"]:
+                if name == header_key:
+                    user_key = value.decode("latin-1")
+                    break
+            client = scope.get("client")
+            user_key = user_key or (client[0] if client else None) or "anon"
+            now = time.monotonic()
+            self._calls += 1
+            if self._calls % self._SWEEP_EVERY == 0:
+                self._sweep(now)
+            if not self._admit(user_key, now):
                 await send(
                     {
                         "type": "http.response.start",
@@ -47,5 +75,4 @@ class SimpleRateLimitMiddleware:
                     }
                 )
                 return
-            bucket.append(now)
         await self.app(scope, receive, send)
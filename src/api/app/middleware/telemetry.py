@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import itertools
 import uuid
 import time
 from typing import Dict, Any
 
-from fastapi import Request
 from ..telemetry.logger import telemetry
 
+# Request ids are a random per-process prefix plus a counter: unique without
+# reading OS entropy on every request
+_PROCESS_ID = uuid.uuid4().hex[:12]
+_REQUEST_COUNTER = itertools.count()
+
 
 class TelemetryMiddleware:
     """
@@ -19,6 +24,9 @@ class TelemetryMiddleware:
     - Error monitoring
     """
 
+    _H_REQUEST_ID = b"x-request-id"
+    _H_RESPONSE_TIME = b"x-response-time"
+
     def __init__(self, app):
         self.app = app
 
@@ -27,23 +35,37 @@ class TelemetryMiddleware:
             await self.app(scope, receive, send)
             return
             
+        started = time.monotonic()
+
         # Generate unique request ID
-        request_id = str(uuid.uuid4())
-        request = Request(scope, receive)
+        request_id = f"{_PROCESS_ID}-{next(_REQUEST_COUNTER):x}"
+        request_id_bytes = request_id.encode()
         
+        # Single pass over the raw ASGI headers (names are lowercase bytes)
+        x_user_id = authorization = user_agent = None
+        for name, value in scope["headers"]:
+            if name == b"x-user-id":
+                x_user_id = value.decode("latin-1")
+            elif name == b"authorization":
+                authorization = value.decode("latin-1")
+            elif name == b"user-agent":
+                user_agent = value.decode("latin-1")
+
         # Extract user ID from headers or fallback to client IP
+        client = scope.get("client")
         user_id = (
-            request.headers.get("X-User-Id") 
-            or request.headers.get("Authorization", "").replace("Bearer ", "")[:20]
-            or request.client.host if request.client else "unknown"
+            x_user_id
+            or (authorization or "").replace("Bearer ", "")[:20]
+            or client[0] if client else "unknown"
         )
         
         # Start request tracking
-        context = telemetry.log_request_start(request, request_id, user_id)
+        context = telemetry.log_request_start(scope, request_id, user_id, user_agent)
         
-        # Add request ID to request state for use in routes
-        request.state.request_id = request_id
-        request.state.user_id = user_id
+        # Expose to routes as request.state.* (Starlette backs it with scope["state"])
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        state["user_id"] = user_id
         
         # Intercept response to add headers
         response_captured = {}
@@ -52,15 +74,14 @@ class TelemetryMiddleware:
             if message["type"] == "http.response.start":
                 # Capture response info and add telemetry headers
                 response_captured["status_code"] = message["status"]
-                headers = list(message.get("headers", []))
-                
-                # Add telemetry headers
-                headers.extend([
-                    (b"x-request-id", request_id.encode()),
-                    (b"x-response-time", str(int((time.time() - context["start_time"]) * 1000)).encode()),
-                ])
-                
-                message = {**message, "headers": headers}
+                # Add telemetry headers to a copy: the app may reuse its header list
+                # across responses or send an immutable sequence
+                headers = list(message.get("headers") or ())
+                headers.append((self._H_REQUEST_ID, request_id_bytes))
+                headers.append(
+                    (self._H_RESPONSE_TIME, b"%d" % ((time.monotonic() - started) * 1000))
+                )
+                message["headers"] = headers
             
             await send(message)
         
@@ -15,7 +15,9 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch server-generated columns (ids, created_at/updated_at) with RETURNING on
+    # INSERT and UPDATE, so callers never need a follow-up refresh() SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class User(Base):
@@ -33,12 +35,18 @@ class Conversation(Base):
     created_at: Mapped[datetime] = mapped_column(server_default=func.now(), nullable=False)
 
     user: Mapped[User] = relationship()
+    # The database removes messages via ON DELETE CASCADE; don't load them to delete
+    messages: Mapped[list["Message"]] = relationship(
+        cascade="all, delete-orphan", passive_deletes=True, lazy="raise"
+    )
 
 
 class Message(Base):
     __tablename__ = "messages"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    conversation_id: Mapped[int] = mapped_column(ForeignKey("conversations.id"), nullable=False)
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False
+    )
     role: Mapped[str] = mapped_column(String(32), nullable=False)  # user | assistant | system
     content: Mapped[str] = mapped_column(Text, nullable=False)
     tokens_in: Mapped[Optional[int]]
@@ -51,7 +59,9 @@ class Note(Base):
     __tablename__ = "notes"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    conversation_id: Mapped[Optional[int]] = mapped_column(ForeignKey("conversations.id"))
+    conversation_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE")
+    )
     category_id: Mapped[Optional[int]] = mapped_column(ForeignKey("categories.id"))
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     body: Mapped[str] = mapped_column(Text, nullable=False)
@@ -85,7 +95,9 @@ class Task(Base):
     __tablename__ = "tasks"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    conversation_id: Mapped[Optional[int]] = mapped_column(ForeignKey("conversations.id"))
+    conversation_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE")
+    )
     category_id: Mapped[Optional[int]] = mapped_column(ForeignKey("categories.id"))
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
@@ -101,7 +113,9 @@ class Task(Base):
 class ToolRun(Base):
     __tablename__ = "tool_runs"
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    conversation_id: Mapped[int] = mapped_column(ForeignKey("conversations.id"), nullable=False)
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False
+    )
     tool_name: Mapped[str] = mapped_column(String(128), nullable=False)
     input_json: Mapped[Optional[dict]] = mapped_column(JSON)
     output_json: Mapped[Optional[dict]] = mapped_column(JSON)
@@ -122,3 +136,11 @@ class AuditLog(Base):
 
 Index("idx_tasks_due_status", Task.due_at, Task.status)
 Index("idx_notes_created", Note.created_at)
+Index("ix_messages_conversation_created", Message.conversation_id, Message.created_at.desc())
+# (owner, newest first) serves both owner lookups and the ORDER BY ... LIMIT listings
+Index("ix_conversations_user_created", Conversation.user_id, Conversation.created_at.desc())
+Index("ix_notes_user_created", Note.user_id, Note.created_at.desc())
+Index("ix_tasks_user_created", Task.user_id, Task.created_at.desc())
+Index("ix_notes_category", Note.category_id)
+Index("ix_tasks_user_status", Task.user_id, Task.status)
+Index("ix_tasks_category", Task.category_id)
@@ -3,7 +3,15 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Request bodies: drop unknown fields, trim whitespace, cap pathological strings
+INPUT_CONFIG = ConfigDict(extra="ignore", str_strip_whitespace=True, str_max_length=65536)
+# Responses are built from ORM rows and never mutated; undo the input-only
+# string handling inherited from the *Create bases
+OUTPUT_CONFIG = ConfigDict(
+    from_attributes=True, frozen=True, str_strip_whitespace=False, str_max_length=None
+)
 
 
 class HealthResponse(BaseModel):
@@ -13,12 +21,16 @@ class HealthResponse(BaseModel):
 
 
 class NoteCreate(BaseModel):
+    model_config = INPUT_CONFIG
+
     title: str
     body: str
     tags: list[str] | None = None
 
 
 class NoteUpdate(BaseModel):
+    model_config = INPUT_CONFIG
+
     title: str | None = None
     body: str | None = None
     tags: list[str] | None = None
@@ -26,6 +38,8 @@ class NoteUpdate(BaseModel):
 
 
 class NoteOut(NoteCreate):
+    model_config = OUTPUT_CONFIG
+
     id: int
     user_id: int
     conversation_id: int | None = None
@@ -35,6 +49,8 @@ class NoteOut(NoteCreate):
 
 
 class TaskCreate(BaseModel):
+    model_config = INPUT_CONFIG
+
     title: str
     description: str | None = None
     due_at: datetime | None = None
@@ -43,6 +59,8 @@ class TaskCreate(BaseModel):
 
 
 class TaskUpdate(BaseModel):
+    model_config = INPUT_CONFIG
+
     title: str | None = None
     description: str | None = None
     due_at: datetime | None = None
@@ -52,6 +70,8 @@ class TaskUpdate(BaseModel):
 
 
 class TaskOut(TaskCreate):
+    model_config = OUTPUT_CONFIG
+
     id: int
     user_id: int
     conversation_id: int | None = None
@@ -61,6 +81,8 @@ class TaskOut(TaskCreate):
 
 
 class CategoryCreate(BaseModel):
+    model_config = INPUT_CONFIG
+
     name: str
     description: str | None = None
     color: str | None = None  # Hex color code
@@ -68,6 +90,8 @@ class CategoryCreate(BaseModel):
 
 
 class CategoryUpdate(BaseModel):
+    model_config = INPUT_CONFIG
+
     name: str | None = None
     description: str | None = None
     color: str | None = None
@@ -75,6 +99,8 @@ class CategoryUpdate(BaseModel):
 
 
 class CategoryOut(CategoryCreate):
+    model_config = OUTPUT_CONFIG
+
     id: int
     user_id: int
     created_at: datetime
@@ -107,6 +133,8 @@ class MessageIn(BaseModel):
 
 
 class MessageOut(BaseModel):
+    model_config = OUTPUT_CONFIG
+
     id: int
     conversation_id: int
     role: Literal["user", "assistant", "system"]
@@ -118,10 +146,14 @@ class MessageOut(BaseModel):
 
 
 class ConversationCreate(BaseModel):
+    model_config = INPUT_CONFIG
+
     title: str | None = None
 
 
 class ConversationOut(BaseModel):
+    model_config = OUTPUT_CONFIG
+
     id: int
     user_id: int
     title: str
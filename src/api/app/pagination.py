@@ -0,0 +1,48 @@
+"""Keyset (seek) pagination over ``(created_at, id)``.
+
+Listing endpoints keep returning plain JSON arrays; when a page is full the
+cursor for the next one is sent in the ``X-Next-Cursor`` response header and
+passed back as the ``cursor`` query parameter. Unlike OFFSET, seeking past
+the last row costs the same at any depth.
+
+The cursor is the id of the last row served. The query compares against that
+row's own ``(created_at, id)`` in SQL, so timestamps never round-trip through
+the client (SQLite stores them as text, where a re-bound value would not
+compare equal). If that row has since been deleted there is nothing to seek
+from, and the endpoint answers 400 rather than a silently empty page.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def seek(stmt: Select, model, cursor: Optional[int], descending: bool = True) -> Select:
+    """Order ``stmt`` by ``(created_at, id)`` and start after row ``cursor`` if given."""
+    key = tuple_(model.created_at, model.id)
+    if cursor is not None:
+        position = (
+            select(model.created_at, model.id)
+            .where(model.id == cursor)
+            .correlate(None)
+            .scalar_subquery()
+        )
+        stmt = stmt.where(key < position if descending else key > position)
+    if descending:
+        return stmt.order_by(model.created_at.desc(), model.id.desc())
+    return stmt.order_by(model.created_at.asc(), model.id.asc())
+
+
+def unknown_cursor(cursor: int) -> HTTPException:
+    """Error for a ``cursor`` whose row no longer exists (raise it from the route)."""
+    return HTTPException(status_code=400, detail=f"Unknown pagination cursor: {cursor}")
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: Optional[int]) -> None:
+    """Advertise the next page's cursor when this page came back full."""
+    if limit is not None and rows and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
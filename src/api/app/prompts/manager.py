@@ -8,9 +8,14 @@ Supports YAML format with environment-specific overrides and hot-reloading.
 import os
 import yaml
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from functools import lru_cache
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
 
 class PromptManager:
     """Manages loading and caching of prompts from configuration files."""
@@ -26,6 +31,10 @@ class PromptManager:
         
         self.prompts_dir = Path(prompts_dir)
         self._cache: Dict[str, Dict[str, Any]] = {}
+        # Parsed files keyed by path, tagged with the mtime they were parsed at
+        self._file_cache: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+        # (service, prompt_name) -> (system_prompt, temperature or None, prompt config)
+        self._flat: Dict[Tuple[str, str], Tuple[str, Optional[float], Dict[str, Any]]] = {}
         
     def _load_prompt_file(self, filename: str) -> Dict[str, Any]:
         """Load a prompt file from disk.
@@ -42,11 +51,20 @@ class PromptManager:
         """
         file_path = self.prompts_dir / f"{filename}.yaml"
         
-        if not file_path.exists():
-            raise FileNotFoundError(f"Prompt file not found: {file_path}")
+        try:
+            mtime = file_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt file not found: {file_path}") from None
+        
+        # Unchanged since the last parse: skip reading and parsing again
+        cached = self._file_cache.get(file_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
+        with open(file_path, 'rb') as f:
+            data = yaml.load(f, Loader=_Loader) or {}
+        self._file_cache[file_path] = (mtime, data)
+        return data
     
     def get_prompt_config(self, service: str, use_cache: bool = True) -> Dict[str, Any]:
         """Get the full prompt configuration for a service.
@@ -59,9 +77,22 @@ class PromptManager:
             Dictionary containing all prompts for the service
         """
         if not use_cache or service not in self._cache:
-            self._cache[service] = self._load_prompt_file(service)
+            config = self._cache[service] = self._load_prompt_file(service)
+            self._flatten(service, config)
         
         return self._cache[service]
+
+    def _flatten(self, service: str, config: Dict[str, Any]) -> None:
+        """Index a service's prompts so hot getters need a single dict lookup."""
+        for key in [k for k in self._flat if k[0] == service]:
+            del self._flat[key]
+        for name, prompt_config in config.items():
+            if isinstance(prompt_config, dict):
+                self._flat[(service, name)] = (
+                    prompt_config.get('system_prompt', ''),
+                    prompt_config.get('temperature'),
+                    prompt_config,
+                )
     
     def get_prompt(self, service: str, prompt_name: str, use_cache: bool = True) -> Dict[str, Any]:
         """Get a specific prompt configuration.
@@ -95,6 +126,10 @@ class PromptManager:
         Returns:
             System prompt text
         """
+        if use_cache:
+            flat = self._flat.get((service, prompt_name))
+            if flat is not None:
+                return flat[0]
         prompt_config = self.get_prompt(service, prompt_name, use_cache)
         return prompt_config.get('system_prompt', '')
     
@@ -110,6 +145,10 @@ class PromptManager:
         Returns:
             Temperature value
         """
+        if use_cache:
+            flat = self._flat.get((service, prompt_name))
+            if flat is not None:
+                return default if flat[1] is None else flat[1]
         prompt_config = self.get_prompt(service, prompt_name, use_cache)
         return prompt_config.get('temperature', default)
     
@@ -123,6 +162,10 @@ class PromptManager:
         Returns:
             Fallback configuration dictionary
         """
+        if use_cache:
+            flat = self._flat.get((service, 'fallback'))
+            if flat is not None:
+                return flat[2]
         config = self.get_prompt_config(service, use_cache)
         return config.get('fallback', {})
     
@@ -134,15 +177,34 @@ class PromptManager:
         """
         if service:
             self._cache.pop(service, None)
+            self._file_cache.pop(self.prompts_dir / f"{service}.yaml", None)
+            for key in [k for k in self._flat if k[0] == service]:
+                del self._flat[key]
         else:
             self._cache.clear()
+            self._file_cache.clear()
+            self._flat.clear()
+
+
+# Global instances for easy access
+_DEFAULT_PROMPTS_DIR = Path(__file__).parent.resolve()
+
+
+@lru_cache(maxsize=None)
+def _prompt_manager(prompts_dir: Path) -> PromptManager:
+    return PromptManager(prompts_dir)
+
 
+def get_prompt_manager(prompts_dir: Optional[Path] = None) -> PromptManager:
+    """Get the shared prompt manager for ``prompts_dir`` (the default prompts by default).
 
-# Global instance for easy access
-@lru_cache(maxsize=1)
-def get_prompt_manager() -> PromptManager:
-    """Get the global prompt manager instance."""
-    return PromptManager()
+    Every caller asking for the same directory shares one manager, and with it
+    the parsed YAML. The directory is resolved first, so a ``str``, a relative
+    path or ``None`` for the default all map to the same manager.
+    """
+    if prompts_dir is None:
+        return _prompt_manager(_DEFAULT_PROMPTS_DIR)
+    return _prompt_manager(Path(prompts_dir).resolve())
 
 
 # Convenience functions for common operations
@@ -1,72 +1,132 @@
 from __future__ import annotations
 
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import time
+from typing import Callable, Dict, Any, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
 
-from ..db import get_db
-from ..models.orm import Category
+from ..db import get_db, insert_ignore
+from ..models.orm import Category, Note, Task
 from ..models.schemas import CategoryCreate, CategoryOut, CategoryUpdate
 
 router = APIRouter(prefix="/api/categories", tags=["categories"])
 
+# In-process cache of rendered GET bodies: (user_id, category_id or None for the
+# list) -> (expires_at, etag, body). Writes below drop the user's entries; the TTL
+# bounds staleness if another process writes.
+_CACHE_TTL_SECONDS = 60
+_read_cache: Dict[tuple[int, Optional[int]], tuple[float, str, bytes]] = {}
+
+
+def invalidate_category_cache(user_id: Optional[int] = None) -> None:
+    """Drop cached category reads for one user, or for everyone."""
+    if user_id is None:
+        _read_cache.clear()
+        return
+    for key in [k for k in _read_cache if k[0] == user_id]:
+        del _read_cache[key]
+
+
+def _etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _json_response(request: Request, body: bytes, etag: Optional[str] = None) -> Response:
+    """JSON response with an ETag; 304 when the client already has this version."""
+    if etag is None:
+        etag = _etag(body)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def _cached_read(
+    request: Request, key: tuple[int, Optional[int]], load: Callable[[], Any]
+) -> Response:
+    now = time.monotonic()
+    entry = _read_cache.get(key)
+    if entry is None or entry[0] <= now:
+        body = orjson.dumps(load())
+        entry = _read_cache[key] = (now + _CACHE_TTL_SECONDS, _etag(body), body)
+    return _json_response(request, entry[2], entry[1])
+
+
+def _get_owned(db: Session, category_id: int, user_id: int = 1) -> Category:
+    """Load a category by primary key and 404 unless it belongs to ``user_id``.
+
+    ``Session.get`` answers from the identity map when the row is already
+    loaded, so only a miss costs a (primary-key) query.
+    """
+    category = db.get(Category, category_id)
+    if category is None or category.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return category
+
 
 @router.get("", response_model=list[CategoryOut])
-def list_categories(db: Session = Depends(get_db)):
+def list_categories(request: Request, db: Session = Depends(get_db)):
     """Get all categories for the current user."""
-    categories = db.query(Category).filter(Category.user_id == 1).order_by(Category.name).all()
-    return categories
+    def load():
+        # Stream rows in batches so only the rendered dicts accumulate, not every ORM object
+        categories = db.scalars(
+            select(Category)
+            .where(Category.user_id == 1)
+            .order_by(Category.name)
+            .execution_options(yield_per=500)
+        )
+        return [CategoryOut.model_validate(c).model_dump(mode="json") for c in categories]
+    
+    return _cached_read(request, (1, None), load)
 
 
 @router.post("", response_model=CategoryOut)
 def create_category(payload: CategoryCreate, db: Session = Depends(get_db)):
     """Create a new category."""
-    # Check if category name already exists for this user
-    existing = db.query(Category).filter(
-        Category.user_id == 1, 
-        Category.name == payload.name
-    ).first()
+    # Atomic insert: a duplicate name for this user hits the unique index and
+    # returns no row instead of racing a separate existence check
+    stmt = (
+        insert_ignore(Category)
+        .values(
+            user_id=1,
+            name=payload.name,
+            description=payload.description,
+            color=payload.color,
+            icon=payload.icon,
+        )
+        .returning(Category)
+    )
+    category = db.scalars(stmt).one_or_none()
     
-    if existing:
+    if category is None:
         raise HTTPException(status_code=400, detail="Category name already exists")
     
-    category = Category(
-        user_id=1,
-        name=payload.name,
-        description=payload.description,
-        color=payload.color,
-        icon=payload.icon
-    )
-    db.add(category)
     db.commit()
-    db.refresh(category)
+    invalidate_category_cache(1)
     return category
 
 
 @router.get("/{category_id}", response_model=CategoryOut)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+def get_category(category_id: int, request: Request, db: Session = Depends(get_db)):
     """Get a specific category."""
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == 1
-    ).first()
+    def load():
+        category = _get_owned(db, category_id)
+        return CategoryOut.model_validate(category).model_dump(mode="json")
     
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    
-    return category
+    return _cached_read(request, (1, category_id), load)
 
 
 @router.put("/{category_id}", response_model=CategoryOut)
 def update_category(category_id: int, payload: CategoryUpdate, db: Session = Depends(get_db)):
     """Update a category."""
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == 1
-    ).first()
-    
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
+    category = _get_owned(db, category_id)
     
     # Check if new name conflicts with existing category
     if payload.name and payload.name != category.name:
@@ -90,58 +150,72 @@ def update_category(category_id: int, payload: CategoryUpdate, db: Session = Dep
         category.icon = payload.icon
     
     db.commit()
-    db.refresh(category)
+    invalidate_category_cache(1)
     return category
 
 
 @router.delete("/{category_id}")
 def delete_category(category_id: int, db: Session = Depends(get_db)):
     """Delete a category. This will set category_id to NULL for all associated notes and tasks."""
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == 1
-    ).first()
-    
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    
-    # Update all notes and tasks to remove the category reference
-    from ..models.orm import Note, Task
-    
-    db.query(Note).filter(Note.category_id == category_id).update({"category_id": None})
-    db.query(Task).filter(Task.category_id == category_id).update({"category_id": None})
+    # Update all notes and tasks to remove the category reference.
+    # Bulk statements without per-row session sync; one commit covers all three
+    db.execute(
+        update(Note)
+        .where(Note.category_id == category_id)
+        .values(category_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(Task)
+        .where(Task.category_id == category_id)
+        .values(category_id=None)
+        .execution_options(synchronize_session=False)
+    )
     
     # Delete the category
-    db.delete(category)
+    result = db.execute(
+        delete(Category)
+        .where(Category.id == category_id, Category.user_id == 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # Unknown or foreign category: undo the updates above
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Category not found")
     db.commit()
+    invalidate_category_cache(1)
     
     return {"message": "Category deleted successfully"}
 
 
 @router.get("/{category_id}/stats")
-def get_category_stats(category_id: int, db: Session = Depends(get_db)):
+def get_category_stats(category_id: int, request: Request, db: Session = Depends(get_db)):
     """Get statistics for a category (number of notes and tasks)."""
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == 1
-    ).first()
-    
-    if not category:
+    # One round-trip: ownership check plus all counts. Correlated scalar subqueries
+    # rather than joins, which would multiply note rows by task rows.
+    def count_where(model, *criteria):
+        return (
+            select(func.count())
+            .select_from(model)
+            .where(model.category_id == Category.id, *criteria)
+            .scalar_subquery()
+        )
+    
+    stmt = select(
+        count_where(Note).label("notes_count"),
+        count_where(Task).label("tasks_count"),
+        count_where(Task, Task.status == "completed").label("completed_tasks"),
+    ).where(Category.id == category_id, Category.user_id == 1)
+    row = db.execute(stmt).one_or_none()
+    
+    if row is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    from ..models.orm import Note, Task
-    
-    notes_count = db.query(Note).filter(Note.category_id == category_id).count()
-    tasks_count = db.query(Task).filter(Task.category_id == category_id).count()
-    completed_tasks = db.query(Task).filter(
-        Task.category_id == category_id,
-        Task.status == "completed"
-    ).count()
-    
-    return {
+    # Counts depend on note/task writes elsewhere, so only the ETag applies here
+    return _json_response(request, orjson.dumps({
         "category_id": category_id,
-        "notes_count": notes_count,
-        "tasks_count": tasks_count,
-        "completed_tasks": completed_tasks,
-        "pending_tasks": tasks_count - completed_tasks
-    }
+        "notes_count": row.notes_count,
+        "tasks_count": row.tasks_count,
+        "completed_tasks": row.completed_tasks,
+        "pending_tasks": row.tasks_count - row.completed_tasks
+    }))
@@ -1,8 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Literal
+import asyncio
+from functools import lru_cache
+from typing import Any, Dict, List, Literal, NamedTuple, Optional, Tuple
 import logging
 import os
+import re
 
 from ..adapters.llm_provider.reasoning import ReasoningLLMProvider
 from ..config.settings import get_settings
@@ -18,26 +21,158 @@ class ClassificationResponse(BaseModel):
     confidence: float
     reasoning: str
 
-CLASSIFICATION_PROMPT = """
-You are a message classifier for a note-taking AI assistant. Analyze the user's message and classify it into one of these categories:
 
-1. **BRAIN_DUMP**: Long, complex messages with multiple ideas, tasks, or notes. Often meeting notes, brainstorming sessions, or stream-of-consciousness thoughts with multiple actionable items.
+class _ProviderConfig(NamedTuple):
+    provider_type: str
+    model: str
+    host: str
+    api_key: Optional[str]
 
-2. **SIMPLE_TASK**: Clear requests to create a task, todo item, or action item. Usually contains action verbs and specific things to be done.
 
-3. **SIMPLE_NOTE**: Thoughts, ideas, or information to remember. Often starts with "I'm thinking", "Remember", or contains project ideas, observations, or notes.
+@lru_cache(maxsize=1)
+def _provider_config() -> _ProviderConfig:
+    """Resolve which reasoning model to use; the environment is read once per process."""
+    settings = get_settings()
+    host = settings.ollama_host or "http://ollama:11434"
+    
+    # Check for OpenAI configuration (highest priority)
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key:
+        return _ProviderConfig("openai", os.getenv("OPENAI_MODEL", "gpt-4o-mini"), host, api_key)
+    
+    # Check if user wants to use fallback model (llama3.2:1b)
+    if os.getenv("USE_FALLBACK_MODEL") == "true":
+        return _ProviderConfig("ollama", settings.ollama_model or "llama3.2:1b", host, None)
+    
+    # Default to deepseek-r1:8b (better reasoning)
+    return _ProviderConfig("ollama", "deepseek-r1:8b", host, None)
+
+
+@lru_cache(maxsize=4)
+def _reasoning_provider(config: _ProviderConfig) -> ReasoningLLMProvider:
+    """One provider per configuration; its HTTP client pool is reused across requests."""
+    return ReasoningLLMProvider(
+        provider_type=config.provider_type,
+        model=config.model,
+        host=config.host,
+        api_key=config.api_key,
+        temperature=0.1,  # Low temperature for consistent classification
+        max_tokens=200   # Short response for classification
+    )
+
+
+class _ClassifyBatcher:
+    """
+    Coalesce concurrent classification requests into batched LLM calls.
+    
+    Requests queue up for at most ``max_wait`` seconds (or until ``max_batch``
+    are waiting) and are then classified with one completion that shares the
+    classifier system prompt, each caller awaiting its own future.
+    """
+
+    def __init__(self, provider: ReasoningLLMProvider, max_batch: int = 8, max_wait: float = 0.02):
+        self.provider = provider
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: set = set()
+
+    async def classify(self, message: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues and tasks belong to one event loop; start afresh on a new one,
+            # stopping the previous loop's collector if that loop is still open
+            self._abandon()
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._spawn(self._collect(self._queue))
+        future = loop.create_future()
+        self._queue.put_nowait((message, future))
+        return await future
+
+    def _abandon(self) -> list:
+        """Cancel every task and fail every queued request; returns the cancelled tasks."""
+        tasks = [task for task in self._tasks if not task.get_loop().is_closed()]
+        for task in tasks:
+            task.cancel()
+        self._tasks.clear()
+        queue, self._queue, self._loop = self._queue, None, None
+        while queue is not None and not queue.empty():
+            _, future = queue.get_nowait()
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_exception(RuntimeError("Classification batcher closed"))
+        return tasks
+
+    async def aclose(self) -> None:
+        """Stop collecting and dispatching batches (called on application shutdown)."""
+        tasks = self._abandon()
+        current = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(task for task in tasks if task.get_loop() is current), return_exceptions=True
+        )
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _collect(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            try:
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                _fail(batch, RuntimeError("Classification batcher closed"))
+                raise
+            # Dispatch without waiting so the next batch can fill meanwhile
+            self._spawn(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await self.provider.classify_batch([message for message, _ in batch])
+        except asyncio.CancelledError:
+            _fail(batch, RuntimeError("Classification batcher closed"))
+            raise
+        except Exception as e:
+            _fail(batch, e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _fail(batch: List[Tuple[str, asyncio.Future]], error: BaseException) -> None:
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(error)
 
-4. **MESSAGE_ANALYSIS**: General questions, requests for help, or messages that need analysis but don't clearly fit the other categories.
 
-Message to classify: "{message}"
+# One batcher per provider configuration, kept so shutdown can stop them all
+_batchers: Dict[_ProviderConfig, _ClassifyBatcher] = {}
+
+
+def _batcher(config: _ProviderConfig) -> _ClassifyBatcher:
+    batcher = _batchers.get(config)
+    if batcher is None:
+        batcher = _batchers[config] = _ClassifyBatcher(_reasoning_provider(config))
+    return batcher
+
+
+async def aclose_classify_batchers() -> None:
+    """Stop every classification batcher (called on application shutdown)."""
+    for batcher in list(_batchers.values()):
+        await batcher.aclose()
 
-Respond with ONLY a JSON object in this exact format:
-{{
-    "classification": "BRAIN_DUMP|SIMPLE_TASK|SIMPLE_NOTE|MESSAGE_ANALYSIS",
-    "confidence": 0.0-1.0,
-    "reasoning": "Brief explanation of why this classification was chosen"
-}}
-"""
 
 @router.post("/classify-message", response_model=ClassificationResponse)
 async def classify_message(request: ClassificationRequest):
@@ -46,38 +181,8 @@ async def classify_message(request: ClassificationRequest):
     Supports multiple reasoning models including GPT-OSS, OpenAI, and Ollama.
     """
     try:
-        settings = get_settings()
-        
-        # Determine which reasoning model to use
-        provider_type = "ollama"  # Default
-        model = "deepseek-r1:8b"  # Default to deepseek-r1:8b (better reasoning)
-        host = settings.ollama_host or "http://ollama:11434"
-        api_key = None
-        
-        # Check for OpenAI configuration (highest priority)
-        if os.getenv("OPENAI_API_KEY"):
-            provider_type = "openai"
-            api_key = os.getenv("OPENAI_API_KEY")
-            model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        
-        # Check if user wants to use fallback model (llama3.2:1b)
-        elif os.getenv("USE_FALLBACK_MODEL") == "true":
-            provider_type = "ollama"
-            model = settings.ollama_model or "llama3.2:1b"
-            host = settings.ollama_host or "http://ollama:11434"
-        
-        # Initialize reasoning LLM provider
-        reasoning_llm = ReasoningLLMProvider(
-            provider_type=provider_type,
-            model=model,
-            host=host,
-            api_key=api_key,
-            temperature=0.1,  # Low temperature for consistent classification
-            max_tokens=200   # Short response for classification
-        )
-        
-        # Get classification using the specialized method
-        result = await reasoning_llm.classify_message(request.message)
+        # Classified together with any concurrent requests
+        result = await _batcher(_provider_config()).classify(request.message)
         
         return ClassificationResponse(**result)
             
@@ -86,33 +191,35 @@ async def classify_message(request: ClassificationRequest):
         # Return fallback classification
         return _fallback_classification(request.message)
 
+_SEPARATORS = (' and ', ', ', '; ')
+_TASK_KEYWORDS = ('task', 'todo', 'create a task', 'schedule', 'need to', 'review')
+_NOTE_KEYWORDS = ('note', 'remember', 'thinking', 'project', 'idea')
+# One scan for both keyword sets. The lookahead reports a match at every position,
+# so overlapping keywords behave exactly like independent substring checks.
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, _TASK_KEYWORDS + _NOTE_KEYWORDS)) + "))"
+)
+_TASK_KEYWORD_SET = frozenset(_TASK_KEYWORDS)
+
+
 def _fallback_classification(message: str) -> ClassificationResponse:
     """Fallback classification using simple heuristics."""
-    text = message.lower()
-    is_long = len(message) > 100
-    has_multiple = any(sep in message for sep in [' and ', ', ', '; '])
-    
-    if is_long and has_multiple:
-        return ClassificationResponse(
-            classification="BRAIN_DUMP",
-            confidence=0.7,
-            reasoning="Long message with multiple items (fallback heuristic)"
-        )
-    elif any(keyword in text for keyword in ['task', 'todo', 'create a task', 'schedule', 'need to', 'review']):
-        return ClassificationResponse(
-            classification="SIMPLE_TASK",
-            confidence=0.6,
-            reasoning="Task-related keywords detected (fallback heuristic)"
-        )
-    elif any(keyword in text for keyword in ['note', 'remember', 'thinking', 'project', 'idea']):
-        return ClassificationResponse(
-            classification="SIMPLE_NOTE",
-            confidence=0.6,
-            reasoning="Note-related keywords detected (fallback heuristic)"
-        )
+    classification, confidence, reasoning = _fallback_classification_cached(message)
+    return ClassificationResponse(
+        classification=classification, confidence=confidence, reasoning=reasoning
+    )
+
+
+@lru_cache(maxsize=2048)
+def _fallback_classification_cached(message: str) -> Tuple[str, float, str]:
+    # Cache primitives rather than the (mutable) response model
+    if len(message) > 100 and any(sep in message for sep in _SEPARATORS):
+        return "BRAIN_DUMP", 0.7, "Long message with multiple items (fallback heuristic)"
+
+    matched = _KEYWORD_RE.findall(message.lower())
+    if not _TASK_KEYWORD_SET.isdisjoint(matched):
+        return "SIMPLE_TASK", 0.6, "Task-related keywords detected (fallback heuristic)"
+    elif matched:
+        return "SIMPLE_NOTE", 0.6, "Note-related keywords detected (fallback heuristic)"
     else:
-        return ClassificationResponse(
-            classification="MESSAGE_ANALYSIS",
-            confidence=0.5,
-            reasoning="General message requiring analysis (fallback heuristic)"
-        )
+        return "MESSAGE_ANALYSIS", 0.5, "General message requiring analysis (fallback heuristic)"
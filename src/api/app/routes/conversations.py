@@ -1,33 +1,23 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
-from typing import List
-
-from ..db import get_db
-from ..models.orm import Conversation, Message, User, Note, Task
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from ..db import get_async_db
+from ..pagination import seek, set_next_cursor, unknown_cursor
+from ..serialization import rows_response
+from ..models.orm import Conversation, Message, User
 from ..models.schemas import ConversationCreate, ConversationOut, MessageOut
 
 router = APIRouter(prefix="/api/conversations", tags=["conversations"])
 
 
-@router.options("")
-async def conversations_options():
-    """Handle CORS preflight requests for conversations endpoint."""
-    return Response(
-        status_code=200,
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-            "Access-Control-Allow-Headers": "*",
-        }
-    )
-
-
 @router.post("", response_model=ConversationOut)
 async def create_conversation(
     conversation: ConversationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new conversation."""
     # For now, use user_id = 1 (default user)
@@ -35,7 +25,7 @@ async def create_conversation(
     user_id = 1
     
     # Ensure user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -44,8 +34,7 @@ async def create_conversation(
         title=conversation.title or "New Conversation"
     )
     db.add(db_conversation)
-    db.commit()
-    db.refresh(db_conversation)
+    await db.commit()
     
     return db_conversation
 
@@ -53,32 +42,34 @@ async def create_conversation(
 @router.get("", response_model=List[ConversationOut])
 async def list_conversations(
     limit: int = 50,
-    offset: int = 0,
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all conversations for the current user."""
     # For now, use user_id = 1 (default user)
     user_id = 1
     
-    conversations = db.query(Conversation)\
-        .filter(Conversation.user_id == user_id)\
-        .order_by(Conversation.created_at.desc())\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    conversations = (await db.scalars(
+        seek(select(Conversation).where(Conversation.user_id == user_id), Conversation, cursor)
+        .limit(limit)
+    )).all()
     
-    return conversations
+    # Only an empty page needs a second query to tell "end of list" from a stale cursor
+    if not conversations and cursor is not None and await db.get(Conversation, cursor) is None:
+        raise unknown_cursor(cursor)
+    
+    response = rows_response(conversations, ConversationOut)
+    set_next_cursor(response, conversations, limit)
+    return response
 
 
 @router.get("/{conversation_id}", response_model=ConversationOut)
 async def get_conversation(
     conversation_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific conversation."""
-    conversation = db.query(Conversation)\
-        .filter(Conversation.id == conversation_id)\
-        .first()
+    conversation = await db.get(Conversation, conversation_id)
     
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
@@ -90,70 +81,55 @@ async def get_conversation(
 async def get_conversation_messages(
     conversation_id: int,
     limit: int = 100,
-    offset: int = 0,
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get messages for a specific conversation."""
-    # Verify conversation exists
-    conversation = db.query(Conversation)\
-        .filter(Conversation.id == conversation_id)\
-        .first()
-    
-    if not conversation:
+    messages = (await db.scalars(
+        seek(
+            select(Message).where(Message.conversation_id == conversation_id),
+            Message,
+            cursor,
+            descending=False,
+        ).limit(limit)
+    )).all()
+    
+    # Only an empty page needs a second query to tell "no messages" from "no conversation"
+    if not messages and await db.get(Conversation, conversation_id) is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    if not messages and cursor is not None and await db.get(Message, cursor) is None:
+        raise unknown_cursor(cursor)
     
-    messages = db.query(Message)\
-        .filter(Message.conversation_id == conversation_id)\
-        .order_by(Message.created_at.asc())\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
-    
-    return messages
+    response = rows_response(messages, MessageOut)
+    set_next_cursor(response, messages, limit)
+    return response
 
 
 @router.delete("/{conversation_id}")
 async def delete_conversation(
     conversation_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a conversation and all its related data."""
-    conversation = db.query(Conversation)\
-        .filter(Conversation.id == conversation_id)\
-        .first()
-    
-    if not conversation:
+    # Messages, notes, tasks and tool runs go with it via ON DELETE CASCADE;
+    # RETURNING doubles as the existence check
+    user_id = await db.scalar(
+        delete(Conversation)
+        .where(Conversation.id == conversation_id)
+        .returning(Conversation.user_id),
+        execution_options={"synchronize_session": False},
+    )
+    if user_id is None:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Conversation not found")
-    
-    user_id = conversation.user_id
-    
-    # Delete all related data first (in order of dependencies)
-    # 1. Delete all messages
-    db.query(Message)\
-        .filter(Message.conversation_id == conversation_id)\
-        .delete()
-    
-    # 2. Delete all notes that reference this conversation
-    db.query(Note)\
-        .filter(Note.conversation_id == conversation_id)\
-        .delete()
-    
-    # 3. Delete all tasks that reference this conversation
-    db.query(Task)\
-        .filter(Task.conversation_id == conversation_id)\
-        .delete()
-    
-    # 4. Finally delete the conversation
-    db.delete(conversation)
-    db.commit()
 
-    # Ensure at least one conversation exists for the user
-    remaining = db.query(Conversation).filter(Conversation.user_id == user_id).count()
-    if remaining == 0:
+    # Ensure at least one conversation exists for the user, in the same transaction
+    remaining = await db.scalar(select(exists().where(Conversation.user_id == user_id)))
+    if not remaining:
         new_conv = Conversation(user_id=user_id, title="New Conversation")
         db.add(new_conv)
-        db.commit()
-        db.refresh(new_conv)
+        await db.commit()
         return {"message": "Conversation deleted successfully", "new_conversation_id": new_conv.id}
 
+    await db.commit()
     return {"message": "Conversation deleted successfully"}
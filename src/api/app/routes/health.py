@@ -1,9 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import logging
+import time
 import httpx
 from datetime import datetime
+from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["health"])
@@ -20,11 +23,38 @@ class HealthResponse(BaseModel):
     models: List[str] = []
     system_ready: bool = False
 
+# Probes arrive far more often than service state changes; serve a short-lived
+# snapshot and let concurrent probes share one in-flight check.
+_HEALTH_TTL_SECONDS = 3.0
+_health_cache: Tuple[float, Optional[HealthResponse]] = (0.0, None)
+_health_lock = asyncio.Lock()
+
+
+def _cached_health() -> Optional[HealthResponse]:
+    cached_at, response = _health_cache
+    if response is not None and time.monotonic() - cached_at < _HEALTH_TTL_SECONDS:
+        return response
+    return None
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
     Comprehensive health check endpoint that returns the status of all services and models.
     """
+    global _health_cache
+    response = _cached_health()
+    if response is None:
+        async with _health_lock:
+            # Another probe may have refreshed the snapshot while we waited
+            response = _cached_health()
+            if response is None:
+                response = await _compute_health()
+                _health_cache = (time.monotonic(), response)
+    return response
+
+
+async def _compute_health() -> HealthResponse:
     try:
         # Check database connection
         db_status = await _check_database()
@@ -68,19 +98,14 @@ async def health_check():
 async def _check_database() -> ServiceStatus:
     """Check database connectivity."""
     try:
-        from ..db import SessionLocal
-        # Test database connection by creating a session
-        db = SessionLocal()
-        try:
-            # Simple query to test connection
-            from sqlalchemy import text
-            db.execute(text("SELECT 1"))
-            return ServiceStatus(
-                status="healthy",
-                details={"connection": "active"}
-            )
-        finally:
-            db.close()
+        from ..db import async_engine
+        # Simple query to test connection, awaited so the event loop stays free
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return ServiceStatus(
+            status="healthy",
+            details={"connection": "active"}
+        )
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
         return ServiceStatus(
@@ -88,36 +113,93 @@ async def _check_database() -> ServiceStatus:
             error=str(e)
         )
 
+# Installed models change on the order of minutes; a stale list is refreshed in
+# the background so probes never wait on Ollama once the cache is warm.
+_OLLAMA_MODELS_TTL_SECONDS = 15.0
+_ollama_models_cache: Optional[Tuple[float, List[str]]] = None
+_ollama_refresh: Optional[asyncio.Task] = None
+
+
+_ollama_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_ollama_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client for Ollama, creating it on first use."""
+    global _ollama_client
+    if _ollama_client is None or _ollama_client.is_closed:
+        from ..config.settings import get_settings
+        settings = get_settings()
+        _ollama_client = httpx.AsyncClient(
+            base_url=settings.ollama_host or "http://ollama:11434",
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=10),
+        )
+    return _ollama_client
+
+
+async def aclose_ollama_client() -> None:
+    """Close the shared Ollama client (called on application shutdown)."""
+    global _ollama_client
+    client, _ollama_client = _ollama_client, None
+    if client is not None:
+        await client.aclose()
+
+
+async def _fetch_ollama_models() -> List[str]:
+    response = await _get_ollama_client().get("/api/tags")
+    response.raise_for_status()
+    data = response.json()
+    return [model["name"] for model in data.get("models", [])]
+
+
+async def _refresh_ollama_models() -> List[str]:
+    global _ollama_models_cache
+    try:
+        models = await _fetch_ollama_models()
+    except Exception:
+        # Drop the stale list so the next check reports the outage
+        _ollama_models_cache = None
+        raise
+    _ollama_models_cache = (time.monotonic(), models)
+    return models
+
+
+async def _ollama_models() -> List[str]:
+    """Return the installed model names, cached for ``_OLLAMA_MODELS_TTL_SECONDS``."""
+    global _ollama_refresh
+    if _ollama_models_cache is None:
+        return await _refresh_ollama_models()
+    
+    fetched_at, models = _ollama_models_cache
+    stale = time.monotonic() - fetched_at >= _OLLAMA_MODELS_TTL_SECONDS
+    if stale and (_ollama_refresh is None or _ollama_refresh.done()):
+        _ollama_refresh = asyncio.create_task(_refresh_ollama_models())
+        # Failures are picked up by the next check; don't log them as unretrieved
+        _ollama_refresh.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return models
+
+
 async def _check_ollama() -> Tuple[ServiceStatus, List[str]]:
     """Check Ollama service and available models."""
     try:
-        from ..config.settings import get_settings
-        settings = get_settings()
-        ollama_host = settings.ollama_host or "http://ollama:11434"
+        models = await _ollama_models()
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(f"{ollama_host}/api/tags")
-            response.raise_for_status()
-            
-            data = response.json()
-            models = [model["name"] for model in data.get("models", [])]
-            
-            # Check if our expected models are available
-            expected_models = ["deepseek-r1:8b", "llama3.2:1b"]
-            missing_models = [model for model in expected_models if model not in models]
+        # Check if our expected models are available
+        expected_models = ["deepseek-r1:8b", "llama3.2:1b"]
+        missing_models = [model for model in expected_models if model not in models]
+        
+        if missing_models:
+            return ServiceStatus(
+                status="degraded",
+                error=f"Missing models: {', '.join(missing_models)}",
+                details={"available_models": models, "missing_models": missing_models}
+            ), models
+        else:
+            return ServiceStatus(
+                status="healthy",
+                details={"available_models": models, "total_models": len(models)}
+            ), models
             
-            if missing_models:
-                return ServiceStatus(
-                    status="degraded",
-                    error=f"Missing models: {', '.join(missing_models)}",
-                    details={"available_models": models, "missing_models": missing_models}
-                ), models
-            else:
-                return ServiceStatus(
-                    status="healthy",
-                    details={"available_models": models, "total_models": len(models)}
-                ), models
-                
     except httpx.TimeoutException:
         return ServiceStatus(
             status="unhealthy",
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Path, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from ..db import get_db
+from ..db import get_async_db, get_db
+from ..pagination import seek, set_next_cursor, unknown_cursor
+from ..serialization import rows_response
 from ..models.schemas import MessageIn, MessageOut, OrchestratorResult
 from ..models.orm import Conversation, Message
-from ..services.orchestrator_service import OrchestratorService
+from ..services.orchestrator_service import OrchestratorService, get_orchestrator
 
 router = APIRouter(prefix="/api/conversations/{conversation_id}/messages", tags=["messages"])
 
@@ -16,26 +21,41 @@ router = APIRouter(prefix="/api/conversations/{conversation_id}/messages", tags=
 async def list_messages(
     conversation_id: int = Path(...),
     limit: int = 100,
-    offset: int = 0,
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get messages for a specific conversation."""
-    # Verify conversation exists
-    conversation = db.query(Conversation)\
-        .filter(Conversation.id == conversation_id)\
-        .first()
+    messages = (await db.scalars(
+        seek(
+            select(Message).where(Message.conversation_id == conversation_id),
+            Message,
+            cursor,
+            descending=False,
+        ).limit(limit)
+    )).all()
     
-    if not conversation:
+    # Only an empty page needs a second query to tell "no messages" from "no conversation"
+    if not messages and await db.get(Conversation, conversation_id) is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    if not messages and cursor is not None and await db.get(Message, cursor) is None:
+        raise unknown_cursor(cursor)
     
-    messages = db.query(Message)\
-        .filter(Message.conversation_id == conversation_id)\
-        .order_by(Message.created_at.asc())\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
-    
-    return messages
+    response = rows_response(messages, MessageOut)
+    set_next_cursor(response, messages, limit)
+    return response
+
+
+def _conversation_state(db: Session, conversation_id: int):
+    """Return ``(user_id, has_messages)`` for a conversation, or None if it doesn't exist.
+
+    One round trip: the EXISTS probe rides along with the conversation lookup.
+    """
+    return db.execute(
+        select(
+            Conversation.user_id,
+            exists().where(Message.conversation_id == conversation_id),
+        ).where(Conversation.id == conversation_id)
+    ).first()
 
 
 @router.post("", response_model=OrchestratorResult)
@@ -44,30 +64,32 @@ async def post_message(
     request: Request,
     conversation_id: int = Path(...),
     db: Session = Depends(get_db),
+    service: OrchestratorService = Depends(get_orchestrator),
+    # Declared for the OpenAPI docs only: IdempotencyMiddleware replays the stored
+    # response for a repeated (path, key) before this handler (and the LLM) runs
     idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Send a message and get orchestrator response."""
     # Verify conversation exists
-    conversation = db.query(Conversation)\
-        .filter(Conversation.id == conversation_id)\
-        .first()
+    # The session is synchronous; keep its I/O off the event loop
+    conversation = await run_in_threadpool(_conversation_state, db, conversation_id)
     
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    
-    # Initialize orchestrator service
-    service = OrchestratorService()
+    user_id, has_history = conversation
     
     # Get request ID from telemetry middleware
     request_id = getattr(request.state, "request_id", None)
     
     # Handle the message with proper user context
-    result = service.handle_message(
+    # Awaits the LLM without tying up a threadpool worker for the whole request
+    result = await service.handle_message(
         db=db, 
-        user_id=conversation.user_id, 
+        user_id=user_id, 
         conversation_id=conversation_id, 
         text=payload.text,
-        request_id=request_id
+        request_id=request_id,
+        has_history=has_history,
     )
     
     return result
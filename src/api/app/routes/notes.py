@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ..db import get_db
+from ..pagination import seek, set_next_cursor, unknown_cursor
+from ..serialization import rows_response
 from ..models.orm import Note
 from ..models.schemas import NoteCreate, NoteOut, NoteUpdate
 
@@ -11,9 +16,21 @@ router = APIRouter(prefix="/api/notes", tags=["notes"])
 
 
 @router.get("", response_model=list[NoteOut])
-def list_notes(db: Session = Depends(get_db)):
-    rows = db.query(Note).order_by(Note.created_at.desc()).all()
-    return rows
+def list_notes(
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    # Unpaginated unless a limit is given, which is what existing clients expect
+    rows = db.scalars(
+        seek(select(Note).where(Note.user_id == 1), Note, cursor).limit(limit)
+    ).all()
+    # Only an empty page needs a second query to tell "end of list" from a stale cursor
+    if not rows and cursor is not None and db.get(Note, cursor) is None:
+        raise unknown_cursor(cursor)
+    response = rows_response(rows, NoteOut)
+    set_next_cursor(response, rows, limit)
+    return response
 
 
 @router.post("", response_model=NoteOut)
@@ -21,14 +38,13 @@ def create_note(payload: NoteCreate, db: Session = Depends(get_db)):
     row = Note(user_id=1, title=payload.title, body=payload.body, tags=payload.tags)
     db.add(row)
     db.flush()
-    db.refresh(row)
     return row
 
 
 @router.get("/{note_id}", response_model=NoteOut)
 def get_note(note_id: int, db: Session = Depends(get_db)):
     """Get a specific note by ID."""
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = db.get(Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
@@ -37,7 +53,7 @@ def get_note(note_id: int, db: Session = Depends(get_db)):
 @router.patch("/{note_id}", response_model=NoteOut)
 def update_note(note_id: int, payload: NoteUpdate, db: Session = Depends(get_db)):
     """Update a note by ID."""
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = db.get(Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
@@ -47,14 +63,13 @@ def update_note(note_id: int, payload: NoteUpdate, db: Session = Depends(get_db)
         setattr(note, field, value)
     
     db.commit()
-    db.refresh(note)
     return note
 
 
 @router.delete("/{note_id}")
 def delete_note(note_id: int, db: Session = Depends(get_db)):
     """Delete a note by ID."""
-    note = db.query(Note).filter(Note.id == note_id).first()
+    note = db.get(Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ..db import get_db
+from ..pagination import seek, set_next_cursor, unknown_cursor
+from ..serialization import rows_response
 from ..models.orm import Task
 from ..models.schemas import TaskCreate, TaskOut, TaskUpdate
 
@@ -11,9 +16,21 @@ router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
 
 @router.get("", response_model=list[TaskOut])
-def list_tasks(db: Session = Depends(get_db)):
-    rows = db.query(Task).order_by(Task.created_at.desc()).all()
-    return rows
+def list_tasks(
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    # Unpaginated unless a limit is given, which is what existing clients expect
+    rows = db.scalars(
+        seek(select(Task).where(Task.user_id == 1), Task, cursor).limit(limit)
+    ).all()
+    # Only an empty page needs a second query to tell "end of list" from a stale cursor
+    if not rows and cursor is not None and db.get(Task, cursor) is None:
+        raise unknown_cursor(cursor)
+    response = rows_response(rows, TaskOut)
+    set_next_cursor(response, rows, limit)
+    return response
 
 
 @router.post("", response_model=TaskOut)
@@ -28,14 +45,13 @@ def create_task(payload: TaskCreate, db: Session = Depends(get_db)):
     )
     db.add(row)
     db.flush()
-    db.refresh(row)
     return row
 
 
 @router.get("/{task_id}", response_model=TaskOut)
 def get_task(task_id: int, db: Session = Depends(get_db)):
     """Get a specific task by ID."""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
@@ -44,7 +60,7 @@ def get_task(task_id: int, db: Session = Depends(get_db)):
 @router.patch("/{task_id}", response_model=TaskOut)
 def update_task(task_id: int, payload: TaskUpdate, db: Session = Depends(get_db)):
     """Update a task by ID."""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -54,14 +70,13 @@ def update_task(task_id: int, payload: TaskUpdate, db: Session = Depends(get_db)
         setattr(task, field, value)
     
     db.commit()
-    db.refresh(task)
     return task
 
 
 @router.delete("/{task_id}")
 def delete_task(task_id: int, db: Session = Depends(get_db)):
     """Delete a task by ID."""
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
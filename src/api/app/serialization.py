@@ -0,0 +1,26 @@
+"""Fast JSON encoding of ORM rows for the hot listing endpoints.
+
+Routes keep their ``response_model`` for the OpenAPI schema but return the
+encoded rows directly, which skips per-row Pydantic validation: the rows come
+straight from the database, so only the schema's field selection is needed.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Sequence, Tuple, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+
+@lru_cache(maxsize=None)
+def _fields(schema: Type[BaseModel]) -> Tuple[str, ...]:
+    return tuple(schema.model_fields)
+
+
+def rows_response(rows: Sequence, schema: Type[BaseModel]) -> Response:
+    """Encode ``rows`` as a JSON array holding the fields of ``schema``."""
+    fields = _fields(schema)
+    body = orjson.dumps([{name: getattr(row, name) for name in fields} for row in rows])
+    return Response(content=body, media_type="application/json")
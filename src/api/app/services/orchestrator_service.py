@@ -1,50 +1,136 @@
 from __future__ import annotations
 
-import json
+import logging
+import re
+import time
+from functools import lru_cache
 
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from ..adapters.llm_provider import LLMMessage, OllamaProvider
+from ..adapters.llm_provider import AsyncOllamaProvider, LLMMessage
 from ..models.orm import Note, Task, Message
 from ..models.schemas import OrchestratorNoteResult, OrchestratorTaskResult, OrchestratorBrainDumpResult
 from ..config.settings import settings
 from ..prompts.manager import get_system_prompt, get_temperature, get_fallback_config
 from ..telemetry.logger import telemetry
 
+logger = logging.getLogger(__name__)
+
+# Phrases explicit enough to turn an LLM "note" into a task
+_EXPLICIT_TASK_RE = re.compile(r'task:|todo:|action:|need to|must', re.IGNORECASE)
+
+
+def _keyword_re(keywords, whole_token: bool = False) -> re.Pattern:
+    """Compile keywords into one case-insensitive alternation, scanned in a single pass.
+
+    With ``whole_token`` a keyword only matches a complete whitespace-delimited
+    token, the same as comparing the items of ``text.split()``.
+    """
+    if not keywords:
+        return re.compile(r'(?!)')  # matches nothing
+    # Longest first so a keyword never loses to one of its own prefixes
+    union = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    if whole_token:
+        union = rf'(?<!\S)(?:{union})(?!\S)'
+    return re.compile(union, re.IGNORECASE)
+
+
+_JSON_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _close_truncated_json(content: str) -> str:
+    """Append whatever closes the strings, arrays and objects left open in ``content``.
+
+    One pass tracks open brackets (outside strings); the closers are joined once.
+    A reply cut mid-key or mid-value may still not parse, which callers handle.
+    """
+    content = content.rstrip()
+    stack: list[str] = []
+    in_string = escaped = False
+    for ch in content:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _JSON_CLOSERS:
+            stack.append(_JSON_CLOSERS[ch])
+        elif ch in '}]' and stack:
+            stack.pop()
+    suffix = '"' if in_string else ''
+    if not in_string:
+        content = content.rstrip(',')
+    return ''.join((content, suffix, *reversed(stack)))
+
+
+@lru_cache(maxsize=4)
+def _default_provider(host: str | None) -> AsyncOllamaProvider:
+    """One provider per host, shared by every orchestrator built for that host."""
+    return AsyncOllamaProvider(host=host)
+
+
+def _estimate_tokens(messages: list[LLMMessage]) -> int:
+    """Rough token count using the common ~4 characters per token heuristic."""
+    return sum(len(m.content) for m in messages) // 4
+
 
 class OrchestratorService:
-    def __init__(self, provider: OllamaProvider | None = None, model: str | None = None):
-        self.provider = provider or OllamaProvider(host=settings.ollama_host)
+    """Turn a user message into notes/tasks.
+
+    The LLM call is awaited so the event loop keeps serving other requests while
+    Ollama works. The SQLAlchemy session is synchronous, so each stretch of
+    database work runs in the threadpool (one at a time, never concurrently).
+    """
+
+    def __init__(self, provider: AsyncOllamaProvider | None = None, model: str | None = None):
+        self.provider = provider or _default_provider(settings.ollama_host)
         self.model = model or settings.ollama_model
         self.context_window_size = 10  # Number of recent messages to include
         self.max_context_tokens = 4000  # Approximate token limit for context
         self.brain_dump_threshold = 100  # Character threshold for brain dump detection
+        self.heuristic_max_chars = 40  # Explicit tasks shorter than this skip the LLM
+
+        # Resolve prompt settings once per service instance rather than per helper call
+        # The system message is the first thing in every request; keeping it
+        # byte-identical lets Ollama reuse its already-evaluated prefix (KV cache)
+        self._simple_system = LLMMessage(
+            role="system", content=get_system_prompt('orchestrator', 'simple_message')
+        )
+        self._simple_temp = get_temperature('orchestrator', 'simple_message', default=0.1)
+        self._brain_system = LLMMessage(
+            role="system", content=get_system_prompt('orchestrator', 'brain_dump')
+        )
+        self._brain_temp = get_temperature('orchestrator', 'brain_dump', default=0.3)
+        self._fallback_cfg = get_fallback_config('orchestrator')
+        brain_dump_config = self._fallback_cfg.get('brain_dump_indicators', {})
+        self._task_keywords = tuple(self._fallback_cfg.get('task_keywords', []))
+        self._action_re = _keyword_re(brain_dump_config.get('action_keywords', []))
+        self._org_re = _keyword_re(
+            brain_dump_config.get('organizational_keywords', []), whole_token=True
+        )
 
     def _get_conversation_context(self, db: Session, conversation_id: int) -> list[LLMMessage]:
         """Retrieve recent conversation messages for context."""
-        # Get recent messages (excluding the current user message we just added)
-        recent_messages = (
-            db.query(Message)
-            .filter(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at.desc())
+        # Only role and content, as plain rows: no ORM objects or identity-map entries.
+        # Served by ix_messages_conversation_created.
+        stmt = (
+            select(Message.role, Message.content)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
             .limit(self.context_window_size)
-            .all()
         )
+        rows = db.execute(stmt).all()
         
         # Convert to LLM messages in chronological order (oldest first)
-        context_messages = []
-        for msg in reversed(recent_messages):
-            # Skip the current user message we just added
-            if msg.role == "user" and len(context_messages) == 0:
-                continue
-                
-            context_messages.append(
-                LLMMessage(
-                    role=msg.role,
-                    content=msg.content
-                )
-            )
+        context_messages = [LLMMessage(role=role, content=content) for role, content in rows[::-1]]
         
         # Rough token estimation and truncation
         total_chars = sum(len(msg.content) for msg in context_messages)
@@ -65,16 +151,8 @@ class OrchestratorService:
         """Light validation for edge cases - 7B model is generally very accurate."""
         # With the 7B model, we mostly trust the LLM's classification
         # Only apply minimal fallback for very obvious cases
-        fallback_config = get_fallback_config('orchestrator')
-        task_keywords = fallback_config.get('task_keywords', [])
-        
-        lower_text = text.lower()
-        
-        # Only override if we find very explicit task indicators and LLM said note
-        explicit_task_indicators = ['task:', 'todo:', 'action:', 'need to', 'must']
-        has_explicit_indicators = any(keyword in lower_text for keyword in explicit_task_indicators)
-        
-        if (llm_result.get("type") == "note" and has_explicit_indicators):
+        # Only override if the LLM said note and we find very explicit task indicators
+        if llm_result.get("type") == "note" and _EXPLICIT_TASK_RE.search(text):
             # Convert note to task for very explicit cases
             note_data = llm_result.get("note", {})
             title = note_data.get("title", text[:120])
@@ -94,314 +172,326 @@ class OrchestratorService:
     
     def _is_brain_dump(self, text: str) -> bool:
         """Detect if the input is a brain dump requiring multi-item processing."""
-        fallback_config = get_fallback_config('orchestrator')
-        brain_dump_config = fallback_config.get('brain_dump_indicators', {})
-        
-        action_keywords = brain_dump_config.get('action_keywords', [])
-        organizational_keywords = brain_dump_config.get('organizational_keywords', [])
-        
         # Heuristics for brain dump detection
         indicators = [
             len(text) > self.brain_dump_threshold,  # Length threshold
             text.count('\n') > 2,  # Multiple lines
             text.count('.') > 3,  # Multiple sentences
             text.count(',') > 4,  # Multiple comma-separated items
-            any(keyword in text.lower() for keyword in action_keywords),  # Action keywords
-            len([word for word in text.split() if word.lower() in organizational_keywords]) > 2  # Multiple organizational keywords
+            self._action_re.search(text) is not None,  # Action keywords
+            len(self._org_re.findall(text)) > 2  # Multiple organizational keywords
         ]
         
         # Return True if multiple indicators are present
         return sum(indicators) >= 2
 
-    def _process_brain_dump(self, db: Session, user_id: int, conversation_id: int, text: str, context_messages: list[LLMMessage], request_id: str = None) -> dict:
+    async def _process_brain_dump(
+        self,
+        db: Session,
+        user_id: int,
+        conversation_id: int,
+        text: str,
+        context_messages: list[LLMMessage],
+        request_id: str = None,
+    ) -> dict:
         """Process a brain dump into multiple organized notes and tasks."""
-        system_prompt = get_system_prompt('orchestrator', 'brain_dump')
-        temperature = get_temperature('orchestrator', 'brain_dump', default=0.3)
-        
-        system = LLMMessage(
-            role="system",
-            content=system_prompt
-        )
+        temperature = self._brain_temp
         
         # Build message sequence with context
-        messages = [system]
+        messages = [self._brain_system]
         messages.extend(context_messages)
         messages.append(LLMMessage(role="user", content=text))
         
         try:
             # Track LLM call with telemetry
-            llm_start_time = datetime.now()
-            resp = self.provider.generate(self.model, messages, temperature=temperature)
-            llm_end_time = datetime.now()
+            llm_start_ns = time.perf_counter_ns()
+            resp = await self.provider.generate(
+                self.model, messages, temperature=temperature, format="json"
+            )
             
             # Log LLM call metrics
-            llm_duration_ms = int((llm_end_time - llm_start_time).total_seconds() * 1000)
+            llm_duration_ms = (time.perf_counter_ns() - llm_start_ns) // 1_000_000
             
             # Estimate token usage (rough approximation)
-            input_text = " ".join([msg.content for msg in messages])
-            prompt_tokens = len(input_text.split()) * 1.3  # Rough estimation
-            completion_tokens = len(resp.content.split()) * 1.3
+            prompt_tokens = _estimate_tokens(messages)
+            completion_tokens = len(resp.content) // 4
             total_tokens = prompt_tokens + completion_tokens
             
             telemetry.log_llm_call(
                 request_id=request_id or "unknown",
                 model=self.model,
                 provider="ollama",
-                prompt_tokens=int(prompt_tokens),
-                completion_tokens=int(completion_tokens),
-                total_tokens=int(total_tokens),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=total_tokens,
                 duration_ms=llm_duration_ms,
                 temperature=temperature,
                 success=True
             )
             
-            # Extract JSON from markdown code blocks if present
-            response_content = resp.content.strip()
-            
-            # Remove markdown code block formatting
-            if response_content.startswith('```json'):
-                response_content = response_content[7:]  # Remove ```json
-            if response_content.startswith('```'):
-                response_content = response_content[3:]  # Remove ```
-            if response_content.endswith('```'):
-                response_content = response_content[:-3]  # Remove trailing ```
-            
-            response_content = response_content.strip()
-            
-            # Try to clean up the JSON response if it's truncated
-            if not response_content.endswith('}'):
-                # Try to close the JSON if it's incomplete
-                if response_content.endswith(']'):
-                    response_content += '}'
-                elif response_content.endswith('"'):
-                    response_content += '}]}'
-                else:
-                    response_content += ']}'
-            
-            data = json.loads(response_content)
+            # format="json" rules out markdown fences, but a reply cut off at the
+            # token limit can still be incomplete: only then try to close it
+            try:
+                data = orjson.loads(resp.content)
+            except orjson.JSONDecodeError:
+                data = orjson.loads(_close_truncated_json(resp.content))
             
             if data.get("type") != "brain_dump" or not isinstance(data.get("items"), list):
                 # Fallback to simple processing
-                return self._process_simple_message(db, user_id, conversation_id, text, context_messages)
-            
-            notes = []
-            tasks = []
-            
-            # Process each item in the brain dump
-            for item in data["items"]:
-                if not isinstance(item, dict):
-                    continue
-                    
-                item_type = item.get("type")
-                title = str(item.get("title", "Untitled"))
-                
-                if item_type == "task":
-                    task = Task(
-                        user_id=user_id,
-                        conversation_id=conversation_id,
-                        title=title,
-                        description=item.get("description"),
-                        status="todo",
-                        priority=item.get("priority")
-                    )
-                    db.add(task)
-                    db.flush()
-                    db.refresh(task)
-                    tasks.append(task)
-                    
-                else:  # Default to note
-                    note = Note(
-                        user_id=user_id,
-                        conversation_id=conversation_id,
-                        title=title,
-                        body=str(item.get("body", item.get("title", ""))),
-                        tags=None  # Simplified for now
-                    )
-                    db.add(note)
-                    db.flush()
-                    db.refresh(note)
-                    notes.append(note)
-            
-            # Create summary response message
-            summary = data.get("summary", f"Organized {len(notes + tasks)} items from your brain dump")
-            items_summary = []
-            if notes:
-                items_summary.append(f"{len(notes)} note{'s' if len(notes) != 1 else ''}")
-            if tasks:
-                items_summary.append(f"{len(tasks)} task{'s' if len(tasks) != 1 else ''}")
-            
-            assistant_content = f"{summary}. Created: {', '.join(items_summary)}."
+                return await self._process_simple_message(
+                    db, user_id, conversation_id, text, context_messages
+                )
             
-            assistant_message = Message(
-                conversation_id=conversation_id,
-                role="assistant",
-                content=assistant_content,
-                created_at=datetime.now()
+            return await run_in_threadpool(
+                self._save_brain_dump, db, user_id, conversation_id, data
             )
-            db.add(assistant_message)
-            db.commit()
             
-            return {
-                "type": "brain_dump",
-                "summary": summary,
-                "notes": notes,
-                "tasks": tasks,
-                "total_items": len(notes) + len(tasks)
-            }
-            
-        except Exception as e:
+        except Exception:
             # Fallback to simple processing if brain dump parsing fails
-            print(f"DEBUG: Brain dump processing failed with exception: {e}")
-            import traceback
-            traceback.print_exc()
-            return self._process_simple_message(db, user_id, conversation_id, text, context_messages)
+            logger.exception("Brain dump processing failed", extra={"request_id": request_id})
+            return await self._process_simple_message(
+                db, user_id, conversation_id, text, context_messages
+            )
 
-    def _process_simple_message(self, db: Session, user_id: int, conversation_id: int, text: str, context_messages: list[LLMMessage], request_id: str = None) -> dict:
-        """Process a simple message (single note or task) - extracted from original logic."""
-        system_prompt = get_system_prompt('orchestrator', 'simple_message')
-        temperature = get_temperature('orchestrator', 'simple_message', default=0.1)
+    def _save_brain_dump(self, db: Session, user_id: int, conversation_id: int, data: dict) -> dict:
+        """Persist the items of a parsed brain dump plus the assistant summary."""
+        notes = []
+        tasks = []
+        
+        # Process each item in the brain dump
+        for item in data["items"]:
+            if not isinstance(item, dict):
+                continue
+                
+            item_type = item.get("type")
+            title = str(item.get("title", "Untitled"))
+            
+            if item_type == "task":
+                task = Task(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    title=title,
+                    description=item.get("description"),
+                    status="todo",
+                    priority=item.get("priority")
+                )
+                tasks.append(task)
+                
+            else:  # Default to note
+                note = Note(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    title=title,
+                    body=str(item.get("body", item.get("title", ""))),
+                    tags=None  # Simplified for now
+                )
+                notes.append(note)
+        
+        # Create summary response message
+        summary = data.get("summary", f"Organized {len(notes + tasks)} items from your brain dump")
+        items_summary = []
+        if notes:
+            items_summary.append(f"{len(notes)} note{'s' if len(notes) != 1 else ''}")
+        if tasks:
+            items_summary.append(f"{len(tasks)} task{'s' if len(tasks) != 1 else ''}")
+        
+        assistant_content = f"{summary}. Created: {', '.join(items_summary)}."
         
-        system = LLMMessage(
-            role="system",
-            content=system_prompt
+        assistant_message = Message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=assistant_content,
+            created_at=datetime.now()
         )
+        # One flush at commit inserts every row, batched per table with RETURNING
+        db.add_all(notes)
+        db.add_all(tasks)
+        db.add(assistant_message)
+        db.commit()
+        
+        return {
+            "type": "brain_dump",
+            "summary": summary,
+            "notes": notes,
+            "tasks": tasks,
+            "total_items": len(notes) + len(tasks)
+        }
+
+    async def _process_simple_message(
+        self,
+        db: Session,
+        user_id: int,
+        conversation_id: int,
+        text: str,
+        context_messages: list[LLMMessage],
+        request_id: str = None,
+    ) -> dict:
+        """Process a simple message (single note or task) - extracted from original logic."""
+        temperature = self._simple_temp
         
         # Build message sequence: system + context + current user message
-        messages = [system]
+        messages = [self._simple_system]
         messages.extend(context_messages)
         messages.append(LLMMessage(role="user", content=text))
         
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         try:
-            resp = self.provider.generate(self.model, messages, temperature=temperature)
+            resp = await self.provider.generate(
+                self.model, messages, temperature=temperature, format="json"
+            )
+            latency_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             end_time = datetime.now()
-            latency_ms = int((end_time - start_time).total_seconds() * 1000)
             
             # Log LLM call metrics
-            input_text = " ".join([msg.content for msg in messages])
-            prompt_tokens = len(input_text.split()) * 1.3  # Rough estimation
-            completion_tokens = len(resp.content.split()) * 1.3
+            prompt_tokens = _estimate_tokens(messages)
+            completion_tokens = len(resp.content) // 4
             total_tokens = prompt_tokens + completion_tokens
             
             telemetry.log_llm_call(
                 request_id=request_id or "unknown",
                 model=self.model,
                 provider="ollama",
-                prompt_tokens=int(prompt_tokens),
-                completion_tokens=int(completion_tokens),
-                total_tokens=int(total_tokens),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=total_tokens,
                 duration_ms=latency_ms,
                 temperature=temperature,
                 success=True
             )
-            data = json.loads(resp.content)
+            data = orjson.loads(resp.content)
             
             # With the 7B model, we trust the LLM classification more
             # Keep minimal validation for edge cases
             data = self._validate_classification(text, data)
             
-            if data.get("type") == "task" and isinstance(data.get("task"), dict):
-                payload = data["task"]
-                task = Task(
-                    user_id=user_id,
-                    conversation_id=conversation_id,
-                    title=str(payload.get("title") or text[:120]),
-                    description=payload.get("description"),
-                    due_at=None,  # parse ISO if provided later
-                    status=str(payload.get("status") or "todo"),
-                    priority=payload.get("priority"),
-                )
-                db.add(task)
-                db.flush()
-                db.refresh(task)
-                
-                # Store assistant response
-                assistant_content = f"Created task: {task.title}"
-                assistant_message = Message(
-                    conversation_id=conversation_id,
-                    role="assistant",
-                    content=assistant_content,
-                    latency_ms=latency_ms,
-                    created_at=end_time
-                )
-                db.add(assistant_message)
-                db.commit()
-                
-                return {"type": "task", "task": task}
-            else:
-                payload = data.get("note", {}) if isinstance(data, dict) else {}
-                note = Note(
-                    user_id=user_id,
-                    conversation_id=conversation_id,
-                    title=str(payload.get("title") or (text.split("\n", 1)[0][:80] or "Note")),
-                    body=str(payload.get("body") or text),
-                    tags=payload.get("tags"),
-                )
-                db.add(note)
-                db.flush()
-                db.refresh(note)
-                
-                # Store assistant response
-                assistant_content = f"Created note: {note.title}"
-                assistant_message = Message(
-                    conversation_id=conversation_id,
-                    role="assistant",
-                    content=assistant_content,
-                    latency_ms=latency_ms,
-                    created_at=end_time
-                )
-                db.add(assistant_message)
-                db.commit()
-                
-                return {"type": "note", "note": note}
+            return await run_in_threadpool(
+                self._save_simple_result,
+                db, user_id, conversation_id, text, data, latency_ms, end_time,
+            )
                 
         except Exception:
-            # Fallback heuristic for simple processing
-            fallback_config = get_fallback_config('orchestrator')
-            task_keywords = fallback_config.get('task_keywords', [])
-            
-            lower = text.lower()
-            if any(k in lower for k in task_keywords):
-                title = text.split(":", 1)[-1].strip() or text[:120]
-                task = Task(user_id=user_id, conversation_id=conversation_id, title=title)
-                db.add(task)
-                db.flush()
-                db.refresh(task)
-                
-                assistant_content = f"Created task: {task.title}"
-                assistant_message = Message(
-                    conversation_id=conversation_id,
-                    role="assistant",
-                    content=assistant_content,
-                    created_at=datetime.now()
-                )
-                db.add(assistant_message)
-                db.commit()
-                
-                return {"type": "task", "task": task}
-                
-            title = text.split("\n", 1)[0][:80] or "Note"
-            note = Note(user_id=user_id, conversation_id=conversation_id, title=title, body=text)
+            return await run_in_threadpool(
+                self._save_fallback_result, db, user_id, conversation_id, text
+            )
+
+    def _save_simple_result(
+        self,
+        db: Session,
+        user_id: int,
+        conversation_id: int,
+        text: str,
+        data: dict,
+        latency_ms: int,
+        end_time: datetime,
+    ) -> dict:
+        """Persist the single note or task the LLM produced plus the assistant reply."""
+        if data.get("type") == "task" and isinstance(data.get("task"), dict):
+            payload = data["task"]
+            task = Task(
+                user_id=user_id,
+                conversation_id=conversation_id,
+                title=str(payload.get("title") or text[:120]),
+                description=payload.get("description"),
+                due_at=None,  # parse ISO if provided later
+                status=str(payload.get("status") or "todo"),
+                priority=payload.get("priority"),
+            )
+            db.add(task)
+        
+            # Store assistant response
+            assistant_content = f"Created task: {task.title}"
+            assistant_message = Message(
+                conversation_id=conversation_id,
+                role="assistant",
+                content=assistant_content,
+                latency_ms=latency_ms,
+                created_at=end_time
+            )
+            db.add(assistant_message)
+            db.commit()
+        
+            return {"type": "task", "task": task}
+        else:
+            payload = data.get("note", {}) if isinstance(data, dict) else {}
+            note = Note(
+                user_id=user_id,
+                conversation_id=conversation_id,
+                title=str(payload.get("title") or (text.split("\n", 1)[0][:80] or "Note")),
+                body=str(payload.get("body") or text),
+                tags=payload.get("tags"),
+            )
             db.add(note)
-            db.flush()
-            db.refresh(note)
-            
+        
+            # Store assistant response
             assistant_content = f"Created note: {note.title}"
             assistant_message = Message(
                 conversation_id=conversation_id,
                 role="assistant",
                 content=assistant_content,
-                created_at=datetime.now()
+                latency_ms=latency_ms,
+                created_at=end_time
             )
             db.add(assistant_message)
             db.commit()
-            
+        
             return {"type": "note", "note": note}
 
-    def handle_message(self, db: Session, user_id: int, conversation_id: int, text: str, request_id: str = None) -> dict:
-        start_time = datetime.now()
+    def _save_fallback_result(
+        self, db: Session, user_id: int, conversation_id: int, text: str
+    ) -> dict:
+        """Fallback heuristic for simple processing, used when the LLM call or its parsing fails."""
+        lower = text.lower()
+        if any(k in lower for k in self._task_keywords):
+            title = text.split(":", 1)[-1].strip() or text[:120]
+            task = Task(user_id=user_id, conversation_id=conversation_id, title=title)
+            db.add(task)
+            
+            assistant_content = f"Created task: {task.title}"
+            assistant_message = Message(
+                conversation_id=conversation_id,
+                role="assistant",
+                content=assistant_content,
+                created_at=datetime.now()
+            )
+            db.add(assistant_message)
+            db.commit()
+            
+            return {"type": "task", "task": task}
+            
+        title = text.split("\n", 1)[0][:80] or "Note"
+        note = Note(user_id=user_id, conversation_id=conversation_id, title=title, body=text)
+        db.add(note)
+        
+        assistant_content = f"Created note: {note.title}"
+        assistant_message = Message(
+            conversation_id=conversation_id,
+            role="assistant",
+            content=assistant_content,
+            created_at=datetime.now()
+        )
+        db.add(assistant_message)
+        db.commit()
         
-        # Store the user message first
+        return {"type": "note", "note": note}
+
+    def _start_turn(
+        self,
+        db: Session,
+        conversation_id: int,
+        text: str,
+        start_time: datetime,
+        has_history: bool = True,
+    ) -> tuple[Message, list[LLMMessage]]:
+        """Load the conversation context for the LLM, then stage the user message.
+
+        The context is read first so it never contains the message being sent.
+        Nothing is flushed here: the user message is inserted together with the
+        result rows by the single commit at the end of the turn.
+        """
+        # Get conversation context for better understanding (a new conversation has none)
+        context_messages = (
+            self._get_conversation_context(db, conversation_id) if has_history else []
+        )
         user_message = Message(
             conversation_id=conversation_id,
             role="user",
@@ -409,33 +499,61 @@ class OrchestratorService:
             created_at=start_time
         )
         db.add(user_message)
-        db.flush()
+        return user_message, context_messages
+
+    async def handle_message(
+        self,
+        db: Session,
+        user_id: int,
+        conversation_id: int,
+        text: str,
+        request_id: str = None,
+        has_history: bool = True,
+    ) -> dict:
+        # Wall-clock time stamps the user message; durations use the monotonic counter
+        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         
-        # Log user activity
-        telemetry.log_user_activity(
-            user_id=str(user_id),
-            action="send_message",
-            resource_type="message",
-            resource_id=str(user_message.id),
-            metadata={"conversation_id": conversation_id, "message_length": len(text)}
+        # Stage the user message; it is committed along with the result
+        user_message, context_messages = await run_in_threadpool(
+            self._start_turn, db, conversation_id, text, start_time, has_history
         )
         
-        # Get conversation context for better understanding
-        context_messages = self._get_conversation_context(db, conversation_id)
-        
+        # Short messages with an explicit task marker ("todo: ...") end up as tasks
+        # whatever the model says (see _validate_classification), so skip the LLM
+        if len(text) < self.heuristic_max_chars and _EXPLICIT_TASK_RE.search(text):
+            input_type = "heuristic"
         # Check if this is a brain dump requiring multi-item processing
-        is_brain_dump = self._is_brain_dump(text)
-        input_type = "brain_dump" if is_brain_dump else "simple_message"
+        elif self._is_brain_dump(text):
+            input_type = "brain_dump"
+        else:
+            input_type = "simple_message"
         
         try:
-            if is_brain_dump:
-                result = self._process_brain_dump(db, user_id, conversation_id, text, context_messages, request_id)
+            if input_type == "heuristic":
+                result = await run_in_threadpool(
+                    self._save_fallback_result, db, user_id, conversation_id, text
+                )
+            elif input_type == "brain_dump":
+                result = await self._process_brain_dump(
+                    db, user_id, conversation_id, text, context_messages, request_id
+                )
             else:
-                result = self._process_simple_message(db, user_id, conversation_id, text, context_messages, request_id)
+                result = await self._process_simple_message(
+                    db, user_id, conversation_id, text, context_messages, request_id
+                )
             
             # Calculate processing time and log success
-            end_time = datetime.now()
-            processing_time_ms = int((end_time - start_time).total_seconds() * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+            
+            # Log user activity (the message has its id now that the turn is committed)
+            telemetry.log_user_activity(
+                user_id=str(user_id),
+                action="send_message",
+                resource_type="message",
+                resource_id=str(user_message.id),
+                metadata={"conversation_id": conversation_id, "message_length": len(text)}
+            )
             
             # Determine output type and items created
             output_type = result.get("type", "unknown")
@@ -457,8 +575,7 @@ class OrchestratorService:
             
         except Exception as e:
             # Log error
-            end_time = datetime.now()
-            processing_time_ms = int((end_time - start_time).total_seconds() * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             telemetry.log_orchestrator_result(
                 request_id=request_id or "unknown",
@@ -471,3 +588,13 @@ class OrchestratorService:
                 error=str(e)
             )
             raise
+
+
+@lru_cache(maxsize=1)
+def get_orchestrator() -> OrchestratorService:
+    """FastAPI dependency providing the shared orchestrator.
+
+    The service holds no per-request state, so one instance (with its prompts and
+    compiled keyword patterns) is built on first use and reused for every request.
+    """
+    return OrchestratorService()
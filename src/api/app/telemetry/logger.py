@@ -1,14 +1,39 @@
 from __future__ import annotations
 
-import json
+import atexit
 import logging
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict, Optional
-from datetime import datetime
 from contextlib import contextmanager
 
+import orjson
 import structlog
-from fastapi import Request, Response
+from fastapi import Response
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    """structlog serializer backed by orjson (stdlib json is several times slower)."""
+    return orjson.dumps(obj, default=kwargs.get("default"), option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+_log_listener: Optional[QueueListener] = None
+
+
+def _queue_handler() -> QueueHandler:
+    """Handler that only enqueues records; a background thread writes them to stderr.
+
+    The listener is started once per process and flushed on interpreter exit.
+    """
+    global _log_listener
+    if _log_listener is None:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter("%(message)s"))
+        _log_listener = QueueListener(queue.SimpleQueue(), stream, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
+    return QueueHandler(_log_listener.queue)
 
 
 class TelemetryLogger:
@@ -30,17 +55,19 @@ class TelemetryLogger:
 
     def _setup_logging(self):
         """Configure structured logging with JSON output."""
+        renderer = structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+        # Epoch seconds (float) rather than an ISO string: no per-event formatting,
+        # and log aggregators parse numeric timestamps natively
+        timestamper = structlog.processors.TimeStamper(fmt=None)
+        # Per-request events are flat key/value records: no positional args, stack
+        # info, exceptions or bytes to decode, so they skip those processors
         structlog.configure(
             processors=[
                 structlog.stdlib.filter_by_level,
                 structlog.stdlib.add_logger_name,
                 structlog.stdlib.add_log_level,
-                structlog.stdlib.PositionalArgumentsFormatter(),
-                structlog.processors.TimeStamper(fmt="iso"),
-                structlog.processors.StackInfoRenderer(),
-                structlog.processors.format_exc_info,
-                structlog.processors.UnicodeDecoder(),
-                structlog.processors.JSONRenderer()
+                timestamper,
+                renderer,
             ],
             context_class=dict,
             logger_factory=structlog.stdlib.LoggerFactory(),
@@ -48,31 +75,50 @@ class TelemetryLogger:
             cache_logger_on_first_use=True,
         )
         
-        # Configure Python logging to output JSON
+        # Configure Python logging to output JSON; the stream write happens off the
+        # calling thread so request handlers only pay for an enqueue
         logging.basicConfig(
             format="%(message)s",
             level=logging.INFO,
+            handlers=[_queue_handler()],
         )
         
         self.logger = structlog.get_logger(self.service_name)
+        # log_error attaches exc_info, which needs the full chain to be rendered
+        self._error_logger = structlog.wrap_logger(
+            logging.getLogger(self.service_name),
+            processors=[
+                structlog.stdlib.filter_by_level,
+                structlog.stdlib.add_logger_name,
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.PositionalArgumentsFormatter(),
+                timestamper,
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.format_exc_info,
+                structlog.processors.UnicodeDecoder(),
+                renderer,
+            ],
+            wrapper_class=structlog.stdlib.BoundLogger,
+        )
 
     def log_request_start(
         self, 
-        request: Request, 
+        scope: Dict[str, Any], 
         request_id: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        user_agent: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Log the start of a request and return context for tracking."""
+        """Log the start of a request (from its ASGI scope) and return context for tracking."""
+        client = scope.get("client")
         context = {
             "request_id": request_id,
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": str(request.query_params),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query_params": scope.get("query_string", b"").decode("latin-1"),
             "user_id": user_id,
-            "client_ip": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
+            "client_ip": client[0] if client else None,
+            "user_agent": user_agent,
             "start_time": time.time(),
-            "timestamp": datetime.utcnow().isoformat(),
         }
         
         self.logger.info(
@@ -139,7 +185,6 @@ class TelemetryLogger:
             temperature=temperature,
             success=success,
             error=error,
-            timestamp=datetime.utcnow().isoformat(),
         )
 
     def log_orchestrator_result(
@@ -165,7 +210,6 @@ class TelemetryLogger:
             processing_time_ms=processing_time_ms,
             success=success,
             error=error,
-            timestamp=datetime.utcnow().isoformat(),
         )
 
     def log_user_activity(
@@ -185,7 +229,6 @@ class TelemetryLogger:
             resource_type=resource_type,
             resource_id=resource_id,
             metadata=metadata or {},
-            timestamp=datetime.utcnow().isoformat(),
         )
 
     def log_error(
@@ -196,7 +239,7 @@ class TelemetryLogger:
         context: Optional[Dict[str, Any]] = None
     ):
         """Log errors with context for debugging and alerting."""
-        self.logger.error(
+        self._error_logger.error(
             "Application error",
             event_type="error",
             error_message=str(error),
@@ -204,7 +247,6 @@ class TelemetryLogger:
             request_id=request_id,
             user_id=user_id,
             context=context or {},
-            timestamp=datetime.utcnow().isoformat(),
             exc_info=True,
         )
 
@@ -223,7 +265,6 @@ class TelemetryLogger:
             value=value,
             unit=unit,
             tags=tags or {},
-            timestamp=datetime.utcnow().isoformat(),
         )
 
     @contextmanager
@@ -234,10 +275,10 @@ class TelemetryLogger:
         metadata: Optional[Dict[str, Any]] = None
     ):
         """Context manager to track operation duration and success/failure."""
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         try:
             yield
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             self.log_performance_metric(
                 f"{operation_name}_duration",
                 duration_ms,
@@ -245,7 +286,7 @@ class TelemetryLogger:
                 {"request_id": request_id, "success": "true", **(metadata or {})}
             )
         except Exception as e:
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = (time.perf_counter_ns() - start_time) // 1_000_000
             self.log_performance_metric(
                 f"{operation_name}_duration",
                 duration_ms,
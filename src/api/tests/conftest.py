@@ -1,12 +1,14 @@
 import os
 import sys
-import importlib
-from unittest.mock import Mock, patch
+import uuid
+from dataclasses import replace
 
+import orjson
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 # Ensure the src/api directory is on PYTHONPATH for test imports
 CURRENT_DIR = os.path.dirname(__file__)
@@ -14,82 +16,121 @@ PROJECT_SRC = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
 if PROJECT_SRC not in sys.path:
     sys.path.insert(0, PROJECT_SRC)
 
-# Import these after setting up the database URL override below
+# Configure the app before anything imports it, so settings and app.db are built
+# once against the test database instead of being reloaded per test.
+# Set testing environment variable to skip lifespan
+os.environ["TESTING"] = "1"
+# Use an in-memory SQLite database for tests. A plain :memory: URL creates a
+# separate database for each connection; a named shared-cache database is visible
+# to every connection in the process (including aiosqlite's worker thread). Each
+# pytest-xdist worker is its own process, so `pytest -n auto` gives every worker
+# its own database
+os.environ["DATABASE_URL"] = (
+    f"sqlite:///file:note_taker_test_{uuid.uuid4().hex}?mode=memory&cache=shared&uri=true"
+)
 
-def create_mock_llm_provider():
-    """Create a mock LLM provider for testing."""
-    # Import LLMResponse here to avoid import-time issues
-    from app.adapters.llm_provider.base import LLMResponse
-    
-    mock_provider = Mock()
-    
-    def mock_generate(model, messages, temperature=0.1):
+from app.adapters.llm_provider.base import LLMResponse  # noqa: E402
+from app.middleware.enhanced_rate_limit import EnhancedRateLimitMiddleware  # noqa: E402
+from app.middleware.idempotency import IdempotencyMiddleware  # noqa: E402
+
+
+class FakeLLMProvider:
+    """Stand-in LLM provider that answers with a note or a task, never calling out."""
+
+    # Only the content differs between replies
+    _template = LLMResponse(model_id="test-model", content="", latency_ms=100)
+
+    async def generate(self, model, messages, temperature=0.1, **kwargs):
         # Simple logic to return note or task based on input
         user_message = messages[-1].content.lower()
         if "task:" in user_message or "todo" in user_message:
-            return LLMResponse(
-                model_id=model,
-                content='{"type": "task", "task": {"title": "' + user_message.replace("task:", "").strip() + '", "status": "todo"}}',
-                latency_ms=100
-            )
+            title = user_message.replace("task:", "").strip()
+            reply = {"type": "task", "task": {"title": title, "status": "todo"}}
         else:
-            return LLMResponse(
-                model_id=model,
-                content='{"type": "note", "note": {"title": "' + user_message[:50] + '", "body": "' + user_message + '"}}',
-                latency_ms=100
-            )
-    
-    mock_provider.generate = mock_generate
-    return mock_provider
+            reply = {"type": "note", "note": {"title": user_message[:50], "body": user_message}}
+        # orjson escapes quotes and control characters in the user's text
+        return replace(self._template, model_id=model, content=orjson.dumps(reply).decode())
 
 
-@pytest.fixture(scope="function")
-def client():
-    """Create a test client with completely isolated database for each test."""
-    # Set testing environment variable to skip lifespan
-    os.environ["TESTING"] = "1"
-    # Override database URL to use a temporary SQLite file for tests  
-    # Note: Using :memory: creates separate databases for each connection
-    # Using a file ensures all connections share the same database
-    import tempfile
-    temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-    temp_db.close()
-    os.environ["DATABASE_URL"] = f"sqlite:///{temp_db.name}"
-    
-    # Force reload database modules to pick up new DATABASE_URL
-    if 'app.config.settings' in sys.modules:
-        importlib.reload(sys.modules['app.config.settings'])
-    if 'app.db' in sys.modules:
-        importlib.reload(sys.modules['app.db'])
-    
-    # Now import all the modules we need
-    from app.adapters.llm_provider.base import LLMResponse  # noqa: E402
-    from app.db import get_db  # noqa: E402
-    from app.main import app  # noqa: E402
+# The fake provider is stateless, so one instance serves every test
+_MOCK_PROVIDER = FakeLLMProvider()
+
+
+@pytest.fixture(autouse=True)
+def _reset_middleware_state():
+    """Clear in-process rate-limit buckets and idempotency replays after each test.
+
+    Starlette builds the middleware stack once per app, so without this the
+    counters for an ``X-User-Id`` carry over into every later test.
+    """
+    yield
+    app_module = sys.modules.get("app.main")
+    layer = app_module.app.middleware_stack if app_module else None
+    while layer is not None:
+        if isinstance(layer, EnhancedRateLimitMiddleware):
+            layer.reset()
+        elif isinstance(layer, IdempotencyMiddleware):
+            layer.clear()
+        layer = getattr(layer, "app", None)
+
+
+def _schema_script(metadata, dialect):
+    """Compile every CREATE TABLE and CREATE INDEX for ``metadata`` into one script."""
+    statements = []
+    for table in metadata.sorted_tables:
+        statements.append(CreateTable(table).compile(dialect=dialect))
+        statements.extend(CreateIndex(index).compile(dialect=dialect) for index in table.indexes)
+    return ";\n".join(str(statement).strip() for statement in statements) + ";"
+
+
+@pytest.fixture(scope="session")
+def _engine():
+    """Create the test database and its schema once for the whole session."""
     # Import all models to ensure they're registered with Base
     from app.models.orm import Base, User, Conversation, Message, Note, Task, ToolRun, AuditLog  # noqa: E402
-    from app.services.orchestrator_service import OrchestratorService  # noqa: E402
-    from app import db as db_module
     from app.config.settings import settings
+    from app.db import make_engine
     
     # Verify we're using SQLite now
     assert "sqlite" in settings.database_url.lower(), f"Expected SQLite, got {settings.database_url}"
     
-    # Create isolated test database with same URL as settings
-    test_engine = create_engine(
-        settings.database_url, 
-        connect_args={"check_same_thread": False},
-        echo=False  # Set to True for debugging SQL
-    )
+    # The app's factory pins in-memory SQLite to one connection (StaticPool), which
+    # keeps the database alive, and turns on foreign keys for it
+    test_engine = make_engine(settings.database_url)
+    # One executescript call instead of create_all's per-table checks and DDL
+    ddl = _schema_script(Base.metadata, test_engine.dialect)
+    with test_engine.connect() as conn:
+        conn.connection.driver_connection.executescript(ddl)
     
-    # Enable foreign key constraints for SQLite
-    @event.listens_for(test_engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+    try:
+        yield test_engine
+    finally:
+        # Closing the last connection discards the in-memory database
+        test_engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def _client(_engine):
+    """Start the app once and route its sessions and LLM calls to test doubles.
+
+    The TestClient keeps one event loop for the whole session, so the lifespan
+    runs once and the aiosqlite engine (bound to that loop) is built once too.
+    """
+    from app.db import get_async_db, get_db, make_async_engine  # noqa: E402
+    from app.main import app  # noqa: E402
+    from app.services.orchestrator_service import (  # noqa: E402
+        OrchestratorService,
+        get_orchestrator,
+    )
+    from app.config.settings import settings
     
-    TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+
+    # Async handlers talk to the same database through aiosqlite
+    test_async_engine = make_async_engine(settings.database_url)
+    TestAsyncSessionLocal = async_sessionmaker(
+        test_async_engine, autoflush=False, expire_on_commit=False
+    )
 
     def test_get_db():
         """Test database dependency that uses the test database."""
@@ -103,80 +144,79 @@ def client():
         finally:
             db.close()
 
-    # Store original values for restoration
-    original_engine = db_module.engine
-    original_SessionLocal = db_module.SessionLocal
-    original_get_db = db_module.get_db
-    
-    # Replace the database module's globals with test versions
-    db_module.engine = test_engine
-    db_module.SessionLocal = TestSessionLocal
-    db_module.get_db = test_get_db
-    
-    # Override the FastAPI dependency as well (belt and suspenders)
-    app.dependency_overrides[get_db] = test_get_db
+    async def test_get_async_db():
+        async with TestAsyncSessionLocal() as db:
+            try:
+                yield db
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
 
-    # Mock OrchestratorService to avoid LLM calls
-    original_orchestrator_init = OrchestratorService.__init__
-    
-    def mock_orchestrator_init(self, provider=None, model=None):
-        self.provider = create_mock_llm_provider()
-        self.model = "test-model"
-        self.context_window_size = 10
-        self.max_context_tokens = 4000
-        self.brain_dump_threshold = 100
-    
-    OrchestratorService.__init__ = mock_orchestrator_init
-    
-    # Create all tables in the test database
-    Base.metadata.create_all(bind=test_engine)
-    
-    # Create basic test data
-    with TestSessionLocal() as db:
-        try:
-            # Create test user
-            user = User(email="test@example.com")
-            db.add(user)
-            db.flush()
-            db.refresh(user)
-            
-            # Create test conversation
-            conversation = Conversation(user_id=user.id, title="Test Conversation")
-            db.add(conversation)
-            db.flush()
-            db.refresh(conversation)
-            
-            db.commit()
-            
-        except Exception as e:
-            db.rollback()
-            raise e
+    # Route the app's sessions to the test engines
+    app.dependency_overrides[get_db] = test_get_db
+    app.dependency_overrides[get_async_db] = test_get_async_db
+    # Mock the orchestrator's LLM provider to avoid LLM calls
+    app.dependency_overrides[get_orchestrator] = lambda: OrchestratorService(
+        provider=_MOCK_PROVIDER, model="test-model"
+    )
 
-    # Create test client
     try:
         with TestClient(app) as test_client:
-            yield test_client
+            try:
+                yield test_client
+            finally:
+                # The async pool's connection belongs to the client's event loop, so
+                # close it there before the loop shuts down
+                test_client.portal.call(test_async_engine.dispose)
     finally:
         # Cleanup - restore everything to original state
-        OrchestratorService.__init__ = original_orchestrator_init
         app.dependency_overrides.clear()
-        
-        # Restore original database module globals
-        db_module.engine = original_engine
-        db_module.SessionLocal = original_SessionLocal
-        db_module.get_db = original_get_db
-        
-        # Drop all tables and dispose engine
-        Base.metadata.drop_all(bind=test_engine)
-        test_engine.dispose()
-        
-        # Clean up temporary database file
-        db_url = os.environ.get("DATABASE_URL", "")
-        if db_url.startswith("sqlite:///") and db_url != "sqlite:///:memory:":
-            db_path = db_url.replace("sqlite:///", "")
-            if os.path.exists(db_path):
-                os.unlink(db_path)
-        
-        # Clean up environment variables
-        os.environ.pop("TESTING", None)
-        os.environ.pop("DATABASE_URL", None)
+
+
+@pytest.fixture(scope="function")
+def client(_engine, _client):
+    """Hand out the shared test client over freshly seeded tables for each test.
+
+    Tables are emptied after every test rather than rolled back: async handlers
+    use their own aiosqlite connection, which neither sees nor rolls back work
+    done inside another connection's transaction.
+    """
+    from app.models.orm import Base, User, Conversation  # noqa: E402
+
+    # Cached category reads would otherwise leak between tests
+    from app.routes.categories import invalidate_category_cache
+    invalidate_category_cache()
+
+    # Create basic test data; tests address the seeded rows as id 1
+    with Session(_engine) as db:
+        db.add_all([
+            User(id=1, email="test@example.com"),
+            Conversation(id=1, user_id=1, title="Test Conversation"),
+        ])
+        db.commit()
+
+    try:
+        yield _client
+    finally:
+        # Empty every table for the next test; SQLite hands out ids from 1 again
+        with _engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def user_client(client):
+    """Return a factory that sends every request as the given ``X-User-Id``.
+
+    The header lives on the shared client for the rest of the test (or until
+    the next call) and is removed afterwards.
+    """
+    def _make(user_id):
+        client.headers["X-User-Id"] = user_id
+        return client
+
+    try:
+        yield _make
+    finally:
+        client.headers.pop("X-User-Id", None)
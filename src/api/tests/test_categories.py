@@ -0,0 +1,52 @@
+def test_list_categories_etag_and_invalidation(client):
+    r = client.post("/api/categories", json={"name": "Work"})
+    assert r.status_code == 200
+
+    r1 = client.get("/api/categories")
+    assert r1.status_code == 200
+    assert [c["name"] for c in r1.json()] == ["Work"]
+    etag = r1.headers["etag"]
+
+    r2 = client.get("/api/categories", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+
+    # A write invalidates the cached list
+    client.post("/api/categories", json={"name": "Home"})
+    r3 = client.get("/api/categories", headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+    assert [c["name"] for c in r3.json()] == ["Home", "Work"]
+
+
+def test_category_stats(client):
+    category = client.post("/api/categories", json={"name": "Stats"}).json()
+
+    r = client.get(f"/api/categories/{category['id']}/stats")
+    assert r.status_code == 200
+    assert r.json() == {
+        "category_id": category["id"],
+        "notes_count": 0,
+        "tasks_count": 0,
+        "completed_tasks": 0,
+        "pending_tasks": 0,
+    }
+    assert client.get(
+        f"/api/categories/{category['id']}/stats", headers={"If-None-Match": r.headers["etag"]}
+    ).status_code == 304
+
+    assert client.get("/api/categories/999/stats").status_code == 404
+
+
+def test_delete_category(client):
+    category = client.post("/api/categories", json={"name": "Temp"}).json()
+    assert client.get(f"/api/categories/{category['id']}").status_code == 200
+
+    assert client.delete(f"/api/categories/{category['id']}").status_code == 200
+    assert client.get(f"/api/categories/{category['id']}").status_code == 404
+    assert client.delete(f"/api/categories/{category['id']}").status_code == 404
+
+
+def test_create_category_duplicate_name(client):
+    assert client.post("/api/categories", json={"name": "Dup"}).status_code == 200
+    r = client.post("/api/categories", json={"name": "Dup"})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Category name already exists"
@@ -0,0 +1,47 @@
+def test_create_and_list_conversations(client):
+    r = client.post("/api/conversations", json={"title": "Second"})
+    assert r.status_code == 200
+    conv = r.json()
+    assert conv["title"] == "Second"
+
+    r2 = client.get("/api/conversations")
+    assert r2.status_code == 200
+    assert {c["id"] for c in r2.json()} >= {1, conv["id"]}
+
+    r3 = client.get(f"/api/conversations/{conv['id']}")
+    assert r3.status_code == 200
+    assert r3.json()["id"] == conv["id"]
+
+
+def test_list_messages_after_post(client):
+    headers = {"X-User-Id": "conversation_messages_test_user"}
+    client.post(
+        "/api/conversations/1/messages", json={"text": "remember the keys"}, headers=headers
+    )
+    r = client.get("/api/conversations/1/messages")
+    assert r.status_code == 200
+    assert any(m["content"] == "remember the keys" for m in r.json())
+    assert client.get("/api/conversations/999/messages").status_code == 404
+
+
+def test_delete_last_conversation_creates_replacement(client):
+    r = client.delete("/api/conversations/1")
+    assert r.status_code == 200
+    new_id = r.json()["new_conversation_id"]
+    assert client.get(f"/api/conversations/{new_id}").status_code == 200
+
+
+def test_delete_missing_conversation_returns_404(client):
+    assert client.delete("/api/conversations/999").status_code == 404
+    assert client.get("/api/conversations/1").status_code == 200
+
+
+def test_delete_conversation_cascades_to_messages(client):
+    headers = {"X-User-Id": "conversation_cascade_test_user"}
+    conv_id = client.post("/api/conversations", json={"title": "Doomed"}).json()["id"]
+    client.post(f"/api/conversations/{conv_id}/messages", json={"text": "a note"}, headers=headers)
+    assert client.get(f"/api/conversations/{conv_id}/messages").json()
+
+    assert client.delete(f"/api/conversations/{conv_id}").status_code == 200
+    assert client.get(f"/api/conversations/{conv_id}/messages").status_code == 404
+    assert client.get("/api/notes").json() == []
@@ -0,0 +1,16 @@
+import pytest
+
+from app import db
+
+
+@pytest.mark.parametrize(
+    "mode, pre_ping, recycle",
+    [(None, True, 3600), ("session", True, 3600), ("transaction", False, 60)],
+)
+def test_engine_options_follow_pgbouncer_mode(monkeypatch, mode, pre_ping, recycle):
+    monkeypatch.setattr(db.settings, "database_pgbouncer_mode", mode)
+    monkeypatch.setattr(db.settings, "db_pool_pre_ping", None)
+    monkeypatch.setattr(db.settings, "db_pool_recycle", None)
+    options = db._engine_options("postgresql+psycopg://u:p@localhost/app")
+    assert options["pool_pre_ping"] is pre_ping
+    assert options["pool_recycle"] == recycle
@@ -1,32 +1,45 @@
-import time
 import pytest
 
+from app.middleware import enhanced_rate_limit
 
-def test_enhanced_rate_limit_messages(client):
-    """Test rate limiting on message endpoint with proper headers."""
-    headers = {"X-User-Id": "test_user"}
-    
-    # Send requests up to the limit (10 for messages)
-    for i in range(10):
-        response = client.post(
-            "/api/conversations/1/messages", 
-            json={"text": f"test message {i}"}, 
-            headers=headers
-        )
+
+MESSAGES = "/api/conversations/1/messages"
+
+
+def _message(i):
+    return {"text": f"test message {i}"}
+
+
+def _note(i):
+    return {"title": f"Note {i}", "body": f"Content {i}"}
+
+
+@pytest.mark.parametrize(
+    ("path", "payload", "limit", "user"),
+    [
+        pytest.param(MESSAGES, _message, 10, "test_user", id="messages"),
+        # Falls back to the client address (or "anonymous") without X-User-Id
+        pytest.param(MESSAGES, _message, 10, None, id="messages-no-user-header"),
+        pytest.param("/api/notes", _note, 20, "notes_test_user", id="notes"),
+    ],
+)
+def test_enhanced_rate_limit(client, user_client, path, payload, limit, user):
+    """Test that each endpoint allows its limit, then rejects with 429 and headers."""
+    if user is not None:
+        client = user_client(user)
+    # Send requests up to the endpoint's limit
+    for i in range(limit):
+        response = client.post(path, json=payload(i))
         assert response.status_code == 200
         
         # Check rate limit headers are present
         assert "x-ratelimit-limit" in response.headers
         assert "x-ratelimit-remaining" in response.headers
         assert "x-ratelimit-reset" in response.headers
-        assert response.headers["x-ratelimit-limit"] == "10"
+        assert response.headers["x-ratelimit-limit"] == str(limit)
     
-    # The 11th request should be rate limited
-    response = client.post(
-        "/api/conversations/1/messages", 
-        json={"text": "rate limited message"}, 
-        headers=headers
-    )
+    # The next request should be rate limited
+    response = client.post(path, json=payload(limit))
     assert response.status_code == 429
     
     # Check rate limit response content
@@ -34,7 +47,7 @@ def test_enhanced_rate_limit_messages(client):
     assert "detail" in data
     assert "limit" in data
     assert "retry_after" in data
-    assert data["limit"] == 10
+    assert data["limit"] == limit
     
     # Check rate limit headers in 429 response
     assert "x-ratelimit-limit" in response.headers
@@ -43,76 +56,70 @@ def test_enhanced_rate_limit_messages(client):
     assert "retry-after" in response.headers
 
 
-def test_enhanced_rate_limit_different_endpoints(client):
+def test_enhanced_rate_limit_different_endpoints(user_client):
     """Test that different endpoints have different rate limits."""
-    headers = {"X-User-Id": "test_user_2"}
+    client = user_client("test_user_2")
     
     # Messages have limit of 10
     for i in range(10):
         response = client.post(
             "/api/conversations/1/messages", 
-            json={"text": f"message {i}"}, 
-            headers=headers
+            json={"text": f"message {i}"}
         )
         assert response.status_code == 200
     
     # 11th message should be rate limited
     response = client.post(
         "/api/conversations/1/messages", 
-        json={"text": "should be limited"}, 
-        headers=headers
+        json={"text": "should be limited"}
     )
     assert response.status_code == 429
     
     # But notes have limit of 20, so they should still work
     response = client.post(
         "/api/notes", 
-        json={"title": "Test Note", "body": "Should work"}, 
-        headers=headers
+        json={"title": "Test Note", "body": "Should work"}
     )
     assert response.status_code == 200
     assert response.headers["x-ratelimit-limit"] == "20"
 
 
-def test_enhanced_rate_limit_different_users(client):
+def test_enhanced_rate_limit_different_users(user_client):
     """Test that different users have separate rate limits."""
     # User 1 hits the limit
-    headers_user1 = {"X-User-Id": "user_1"}
+    client = user_client("user_1")
     for i in range(10):
         response = client.post(
             "/api/conversations/1/messages", 
-            json={"text": f"message {i}"}, 
-            headers=headers_user1
+            json={"text": f"message {i}"}
         )
         assert response.status_code == 200
     
     # User 1's 11th request is rate limited
     response = client.post(
         "/api/conversations/1/messages", 
-        json={"text": "should be limited"}, 
-        headers=headers_user1
+        json={"text": "should be limited"}
     )
     assert response.status_code == 429
     
     # But user 2 should still be able to make requests
-    headers_user2 = {"X-User-Id": "user_2"}
+    client = user_client("user_2")
     response = client.post(
         "/api/conversations/1/messages", 
-        json={"text": "should work"}, 
-        headers=headers_user2
+        json={"text": "should work"}
     )
     assert response.status_code == 200
     assert response.headers["x-ratelimit-remaining"] == "9"  # 9 remaining for user 2
 
 
-def test_enhanced_rate_limit_headers_format(client):
+def test_enhanced_rate_limit_headers_format(user_client, monkeypatch):
     """Test that rate limit headers are properly formatted."""
-    headers = {"X-User-Id": "header_test_user"}
+    monkeypatch.setattr(enhanced_rate_limit, "_now", lambda: 1_700_000_000.0)
+    client = user_client("header_test_user")
     
     response = client.post(
         "/api/conversations/1/messages", 
-        json={"text": "test message"}, 
-        headers=headers
+        json={"text": "test message"}
     )
     assert response.status_code == 200
     
@@ -120,51 +127,24 @@ def test_enhanced_rate_limit_headers_format(client):
     assert response.headers["x-ratelimit-limit"] == "10"
     assert response.headers["x-ratelimit-remaining"] == "9"
     assert response.headers["x-ratelimit-window"] == "60"
-    
-    # Reset time should be a valid timestamp
-    reset_time = int(response.headers["x-ratelimit-reset"])
-    current_time = int(time.time())
-    assert reset_time > current_time
-    assert reset_time <= current_time + 60  # Should be within the window
+    # The window resets one window after the first request
+    assert response.headers["x-ratelimit-reset"] == "1700000060"
 
 
-def test_enhanced_rate_limit_no_user_header(client):
-    """Test rate limiting works without explicit user header (falls back to IP/anonymous)."""
-    # No X-User-Id header provided
+def test_enhanced_rate_limit_window_rolls_over(user_client, monkeypatch):
+    """Test that requests are allowed again once the window has passed."""
+    clock = [1_700_000_000.0]
+    monkeypatch.setattr(enhanced_rate_limit, "_now", lambda: clock[0])
+    client = user_client("rollover_test_user")
+    
     for i in range(10):
-        response = client.post(
-            "/api/conversations/1/messages", 
-            json={"text": f"anonymous message {i}"}
-        )
+        response = client.post(MESSAGES, json=_message(i))
         assert response.status_code == 200
-    
-    # 11th request should be rate limited
-    response = client.post(
-        "/api/conversations/1/messages", 
-        json={"text": "should be limited"}
-    )
+    response = client.post(MESSAGES, json=_message(10))
     assert response.status_code == 429
-
-
-def test_enhanced_rate_limit_notes_higher_limit(client):
-    """Test that notes endpoint has higher limit than messages."""
-    headers = {"X-User-Id": "notes_test_user"}
+    assert response.headers["retry-after"] == "60"
     
-    # Notes should allow 20 requests (vs 10 for messages)
-    for i in range(20):
-        response = client.post(
-            "/api/notes", 
-            json={"title": f"Note {i}", "body": f"Content {i}"}, 
-            headers=headers
-        )
-        assert response.status_code == 200
-        assert response.headers["x-ratelimit-limit"] == "20"
-    
-    # 21st request should be rate limited
-    response = client.post(
-        "/api/notes", 
-        json={"title": "Should be limited", "body": "Content"}, 
-        headers=headers
-    )
-    assert response.status_code == 429
-    assert response.json()["limit"] == 20
+    clock[0] += 61
+    response = client.post(MESSAGES, json=_message(11))
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-remaining"] == "9"
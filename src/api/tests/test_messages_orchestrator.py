@@ -1,3 +1,6 @@
+from datetime import datetime
+
+
 def test_post_message_creates_note_by_default(client):
     headers = {"X-User-Id": "orchestrator_note_test_user"}
     r = client.post("/api/conversations/1/messages", json={"text": "My note body"}, headers=headers)
@@ -12,3 +15,96 @@ def test_post_message_creates_task_when_keyword_present(client):
     assert r.status_code == 200
     data = r.json()
     assert data["type"] == "task"
+
+
+def test_brain_dump_detection_matches_keywords_case_insensitively(client):
+    from app.services.orchestrator_service import OrchestratorService
+
+    service = OrchestratorService()
+    # Organizational keywords plus action keywords, each matched regardless of case
+    assert service._is_brain_dump(
+        "Meeting today: Call Bob, EMAIL Ann, Don't Forget the Task review"
+    )
+    # Organizational keywords only count as whole words
+    assert not service._is_brain_dump("Meetings: calls, emails, Don't Forget the tasks")
+    assert not service._is_brain_dump("call mom")
+
+
+def test_save_brain_dump_persists_all_items(client):
+    from app import db as db_module
+    from app.services.orchestrator_service import OrchestratorService
+
+    data = {
+        "summary": "Sorted",
+        "items": [
+            {"type": "task", "title": "Book flights", "priority": 2},
+            {"type": "note", "title": "Gift ideas", "body": "Books"},
+            {"type": "task", "title": "Call plumber"},
+        ],
+    }
+    with db_module.SessionLocal() as db:
+        result = OrchestratorService()._save_brain_dump(db, 1, 1, data)
+        assert result["total_items"] == 3
+        assert all(item.id is not None for item in result["notes"] + result["tasks"])
+
+    assert [t["title"] for t in client.get("/api/tasks").json()] == ["Call plumber", "Book flights"]
+    assert client.get("/api/notes").json()[0]["body"] == "Books"
+
+
+def test_conversation_context_excludes_only_the_current_message(client):
+    from app import db as db_module
+    from app.services.orchestrator_service import OrchestratorService
+
+    headers = {"X-User-Id": "orchestrator_context_test_user"}
+    client.post("/api/conversations/1/messages", json={"text": "first note"}, headers=headers)
+
+    with db_module.SessionLocal() as db:
+        _, context = OrchestratorService()._start_turn(db, 1, "second note", datetime.now())
+
+    assert [(m.role, m.content) for m in context] == [
+        ("user", "first note"),
+        ("assistant", "Created note: first note"),
+    ]
+
+
+def test_short_explicit_task_skips_the_llm(client):
+    headers = {"X-User-Id": "orchestrator_heuristic_test_user"}
+    r = client.post(
+        "/api/conversations/1/messages", json={"text": "todo: call the bank"}, headers=headers
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["type"] == "task"
+    # The mock LLM would have kept the "todo:" prefix in the title
+    assert data["task"]["title"] == "call the bank"
+
+
+def test_close_truncated_json_closes_open_strings_and_brackets():
+    import orjson
+
+    from app.services.orchestrator_service import _close_truncated_json
+
+    truncated = (
+        '{"type": "brain_dump", "items": '
+        '[{"type": "note", "title": "a \\"b\\" [c"}, {"type": "task", "title": "Bo'
+    )
+    data = orjson.loads(_close_truncated_json(truncated))
+    assert [item["title"] for item in data["items"]] == ['a "b" [c', "Bo"]
+    closed = _close_truncated_json('{"items": [{"type": "note"},')
+    assert orjson.loads(closed) == {"items": [{"type": "note"}]}
+
+
+def test_post_message_with_quotes_is_parsed_from_llm_reply(client):
+    headers = {"X-User-Id": "orchestrator_quotes_test_user"}
+    r = client.post(
+        "/api/conversations/1/messages", json={"text": 'Remember the "Blue" door'}, headers=headers
+    )
+    assert r.status_code == 200
+    # The mock LLM lowercases; the fallback path (taken on unparseable JSON) would not
+    assert r.json()["note"]["title"] == 'remember the "blue" door'
+
+
+def test_get_orchestrator_reuses_one_instance():
+    from app.services.orchestrator_service import get_orchestrator
+
+    assert get_orchestrator() is get_orchestrator()
@@ -18,3 +18,32 @@ def test_create_and_list_task(client):
     assert r2.status_code == 200
     tasks = r2.json()
     assert any(t["id"] == task["id"] for t in tasks)
+
+
+def test_list_notes_keyset_pagination(client):
+    ids = [
+        client.post("/api/notes", json={"title": f"N{i}", "body": "b"}).json()["id"]
+        for i in range(3)
+    ]
+    first = client.get("/api/notes", params={"limit": 2})
+    assert first.status_code == 200
+    cursor = first.headers["x-next-cursor"]
+    second = client.get("/api/notes", params={"limit": 2, "cursor": cursor})
+    assert "x-next-cursor" not in second.headers
+    seen = [n["id"] for n in first.json() + second.json()]
+    assert sorted(seen) == sorted(ids)
+    assert client.get("/api/notes", params={"cursor": "not-a-cursor"}).status_code == 422
+
+
+def test_list_notes_rejects_a_deleted_cursor(client):
+    ids = [
+        client.post("/api/notes", json={"title": f"N{i}", "body": "b"}).json()["id"]
+        for i in range(2)
+    ]
+    cursor = client.get("/api/notes", params={"limit": 1}).headers["x-next-cursor"]
+    assert client.delete(f"/api/notes/{cursor}").status_code == 200
+    r = client.get("/api/notes", params={"limit": 1, "cursor": cursor})
+    assert r.status_code == 400
+    # A live cursor at the end of the list is still just an empty page
+    r = client.get("/api/notes", params={"limit": 1, "cursor": min(ids)})
+    assert r.status_code == 200 and r.json() == []
@@ -0,0 +1,29 @@
+import asyncio
+
+import httpx
+import orjson
+
+from app.adapters.llm_provider import AsyncOllamaProvider, LLMMessage
+
+
+def test_generate_sends_format(monkeypatch):
+    payloads = []
+
+    async def handler(request):
+        payloads.append(orjson.loads(request.content))
+        return httpx.Response(200, json={"message": {"content": "{}"}})
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(AsyncOllamaProvider, "_client", client)
+        provider = AsyncOllamaProvider(host="http://ollama.test")
+        messages = [LLMMessage(role="user", content="hi")]
+        try:
+            await provider.generate("test-model", messages)
+            await provider.generate("test-model", messages, format="json")
+        finally:
+            await AsyncOllamaProvider.aclose()
+
+    asyncio.run(run())
+    assert "format" not in payloads[0]
+    assert payloads[1]["format"] == "json"
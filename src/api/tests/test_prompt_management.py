@@ -2,145 +2,134 @@
 Tests for the prompt management system.
 """
 
+import json
+
 import pytest
-from pathlib import Path
-import tempfile
-import yaml
 
-from app.prompts.manager import PromptManager, get_system_prompt, get_temperature
+from app.prompts.manager import (
+    PromptManager,
+    get_prompt_manager,
+    get_system_prompt,
+    get_temperature,
+)
 
 
-def test_prompt_manager_loads_config():
-    """Test that PromptManager can load prompt configurations."""
-    # Create a temporary prompt file
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        test_config = {
-            'test_prompt': {
-                'system_prompt': 'Test system prompt',
-                'temperature': 0.5
-            },
-            'fallback': {
-                'keywords': ['test', 'example']
-            }
+# Prompt files shared by the tests below, keyed by service name
+PROMPT_FILES = {
+    'test_service': {
+        'test_prompt': {
+            'system_prompt': 'Test system prompt',
+            'temperature': 0.5
+        },
+        'fallback': {
+            'keywords': ['test', 'example']
         }
-        
-        config_file = temp_path / 'test_service.yaml'
-        with open(config_file, 'w') as f:
-            yaml.safe_dump(test_config, f)
-        
-        # Test PromptManager
-        manager = PromptManager(temp_path)
-        config = manager.get_prompt_config('test_service')
-        
-        assert 'test_prompt' in config
-        assert config['test_prompt']['system_prompt'] == 'Test system prompt'
-        assert config['test_prompt']['temperature'] == 0.5
-
-
-def test_prompt_manager_get_specific_prompt():
-    """Test getting specific prompt configurations."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        test_config = {
-            'brain_dump': {
-                'system_prompt': 'Break down the input',
-                'temperature': 0.3
+    },
+    'orchestrator': {
+        'brain_dump': {
+            'system_prompt': 'Break down the input',
+            'temperature': 0.3
+        },
+        'simple_message': {
+            'system_prompt': 'Classify the input',
+            'temperature': 0.1
+        },
+        'fallback': {
+            'task_keywords': ['task:', 'todo:', 'action:'],
+            'brain_dump_indicators': {
+                'action_keywords': ['need to', 'should'],
+                'organizational_keywords': ['task', 'note']
             }
         }
-        
-        config_file = temp_path / 'orchestrator.yaml'
-        with open(config_file, 'w') as f:
-            yaml.safe_dump(test_config, f)
-        
-        manager = PromptManager(temp_path)
-        prompt = manager.get_prompt('orchestrator', 'brain_dump')
-        
-        assert prompt['system_prompt'] == 'Break down the input'
-        assert prompt['temperature'] == 0.3
-
-
-def test_prompt_manager_convenience_methods():
+    },
+    'test': {'test': {'prompt': 'cached'}},
+}
+
+
+@pytest.fixture(scope="module")
+def prompt_dir(tmp_path_factory):
+    """Write every entry of ``PROMPT_FILES`` as ``<service>.yaml`` once per module."""
+    path = tmp_path_factory.mktemp("prompts")
+    for service, config in PROMPT_FILES.items():
+        # JSON is valid YAML and much cheaper to emit than yaml.safe_dump
+        (path / f"{service}.yaml").write_text(json.dumps(config))
+    return path
+
+
+@pytest.fixture
+def manager(prompt_dir):
+    """A fresh PromptManager (and so an empty cache) over the shared prompt files."""
+    return PromptManager(prompt_dir)
+
+
+def test_prompt_manager_loads_config(manager):
+    """Test that PromptManager can load prompt configurations."""
+    config = manager.get_prompt_config('test_service')
+    
+    assert 'test_prompt' in config
+    assert config['test_prompt']['system_prompt'] == 'Test system prompt'
+    assert config['test_prompt']['temperature'] == 0.5
+
+
+def test_prompt_manager_get_specific_prompt(manager):
+    """Test getting specific prompt configurations."""
+    prompt = manager.get_prompt('orchestrator', 'brain_dump')
+    
+    assert prompt['system_prompt'] == 'Break down the input'
+    assert prompt['temperature'] == 0.3
+
+
+def test_prompt_manager_convenience_methods(manager):
     """Test convenience methods for getting system prompts and temperatures."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        test_config = {
-            'simple_message': {
-                'system_prompt': 'Classify the input',
-                'temperature': 0.1
-            }
-        }
-        
-        config_file = temp_path / 'orchestrator.yaml'
-        with open(config_file, 'w') as f:
-            yaml.safe_dump(test_config, f)
-        
-        manager = PromptManager(temp_path)
-        
-        system_prompt = manager.get_system_prompt('orchestrator', 'simple_message')
-        temperature = manager.get_temperature('orchestrator', 'simple_message')
-        
-        assert system_prompt == 'Classify the input'
-        assert temperature == 0.1
-
-
-def test_prompt_manager_fallback_config():
+    system_prompt = manager.get_system_prompt('orchestrator', 'simple_message')
+    temperature = manager.get_temperature('orchestrator', 'simple_message')
+    
+    assert system_prompt == 'Classify the input'
+    assert temperature == 0.1
+
+
+def test_prompt_manager_fallback_config(manager):
     """Test getting fallback configurations."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        test_config = {
-            'fallback': {
-                'task_keywords': ['task:', 'todo:', 'action:'],
-                'brain_dump_indicators': {
-                    'action_keywords': ['need to', 'should'],
-                    'organizational_keywords': ['task', 'note']
-                }
-            }
-        }
-        
-        config_file = temp_path / 'orchestrator.yaml'
-        with open(config_file, 'w') as f:
-            yaml.safe_dump(test_config, f)
-        
-        manager = PromptManager(temp_path)
-        fallback = manager.get_fallback_config('orchestrator')
-        
-        assert 'task_keywords' in fallback
-        assert 'brain_dump_indicators' in fallback
-        assert fallback['task_keywords'] == ['task:', 'todo:', 'action:']
-
-
-def test_prompt_manager_caching():
+    fallback = manager.get_fallback_config('orchestrator')
+    
+    assert 'task_keywords' in fallback
+    assert 'brain_dump_indicators' in fallback
+    assert fallback['task_keywords'] == ['task:', 'todo:', 'action:']
+
+
+def test_prompt_manager_caching(manager):
     """Test that PromptManager caches configurations properly."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        test_config = {'test': {'prompt': 'cached'}}
-        
-        config_file = temp_path / 'test.yaml'
-        with open(config_file, 'w') as f:
-            yaml.safe_dump(test_config, f)
-        
-        manager = PromptManager(temp_path)
-        
-        # First call should load from file
-        config1 = manager.get_prompt_config('test')
-        
-        # Second call should use cache
-        config2 = manager.get_prompt_config('test')
-        
-        assert config1 is config2  # Same object reference due to caching
-        
-        # Test cache reload
-        manager.reload_cache('test')
-        config3 = manager.get_prompt_config('test')
-        
-        assert config1 is not config3  # Different object after cache reload
+    # First call should load from file
+    config1 = manager.get_prompt_config('test')
+    
+    # Second call should use cache
+    config2 = manager.get_prompt_config('test')
+    
+    assert config1 is config2  # Same object reference due to caching
+    
+    # Test cache reload
+    manager.reload_cache('test')
+    config3 = manager.get_prompt_config('test')
+    
+    assert config1 is not config3  # Different object after cache reload
+
+
+def test_get_prompt_manager_shares_instances_per_directory(tmp_path):
+    """Test that the manager factory hands out one manager per prompts directory."""
+    assert get_prompt_manager() is get_prompt_manager()
+    assert get_prompt_manager(tmp_path) is get_prompt_manager(tmp_path)
+    assert get_prompt_manager(tmp_path) is not get_prompt_manager()
+    # Spellings of the same directory share the manager too
+    assert get_prompt_manager(PromptManager().prompts_dir) is get_prompt_manager()
+    assert get_prompt_manager(str(tmp_path)) is get_prompt_manager(tmp_path)
+    assert get_prompt_manager(tmp_path / "sub" / "..") is get_prompt_manager(tmp_path)
 
 
 def test_orchestrator_prompts_exist():
     """Test that the actual orchestrator prompts exist and are valid."""
     # Test that the real orchestrator.yaml file exists and has required prompts
-    manager = PromptManager()  # Uses default path
+    # The shared default-path manager, whose parse is reused by the rest of the suite
+    manager = get_prompt_manager()
     
     # Test that required prompts exist
     simple_prompt = manager.get_system_prompt('orchestrator', 'simple_message')
@@ -0,0 +1,12 @@
+from collections import Counter
+
+
+def test_routes_registered_once(client):
+    app = client.app
+    registrations = Counter(
+        (route.path, method)
+        for route in app.routes
+        for method in getattr(route, "methods", None) or ()
+    )
+    duplicates = [key for key, count in registrations.items() if count > 1]
+    assert duplicates == []
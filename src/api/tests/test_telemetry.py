@@ -1,6 +1,20 @@
 import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
+
 import pytest
-from unittest.mock import patch, MagicMock
+
+
+@pytest.fixture
+def mock_telemetry(monkeypatch):
+    """Replace the orchestrator's telemetry calls with mocks for one test."""
+    from app.telemetry.logger import telemetry
+
+    mocks = SimpleNamespace(activity=Mock(), result=Mock(), llm=Mock())
+    monkeypatch.setattr(telemetry, "log_user_activity", mocks.activity)
+    monkeypatch.setattr(telemetry, "log_orchestrator_result", mocks.result)
+    monkeypatch.setattr(telemetry, "log_llm_call", mocks.llm)
+    return mocks
 
 
 def test_telemetry_middleware_adds_request_id(client):
@@ -13,52 +27,49 @@ def test_telemetry_middleware_adds_request_id(client):
     assert "x-request-id" in response.headers
     assert "x-response-time" in response.headers
     
-    # Request ID should be a valid UUID-like string
+    # Request ID is a per-process prefix plus a counter, unique per request
     request_id = response.headers["x-request-id"]
-    assert len(request_id) > 30  # UUID is 36 chars with hyphens
+    assert request_id
+    assert client.get("/health", headers=headers).headers["x-request-id"] != request_id
     
     # Response time should be a non-negative integer (could be 0 for very fast requests)
     response_time = int(response.headers["x-response-time"])
     assert response_time >= 0
 
 
-def test_telemetry_logs_message_processing(client):
+def test_telemetry_logs_message_processing(client, mock_telemetry):
     """Test that telemetry logs are generated for message processing."""
     headers = {"X-User-Id": "telemetry_message_test_user"}
     
-    with patch('app.services.orchestrator_service.telemetry.log_user_activity') as mock_log_activity, \
-         patch('app.services.orchestrator_service.telemetry.log_orchestrator_result') as mock_log_result, \
-         patch('app.services.orchestrator_service.telemetry.log_llm_call') as mock_log_llm:
-        
-        response = client.post(
-            "/api/conversations/1/messages", 
-            json={"text": "Test message for telemetry"}, 
-            headers=headers
-        )
-        
-        assert response.status_code == 200
-        
-        # Verify user activity was logged
-        mock_log_activity.assert_called_once()
-        activity_call = mock_log_activity.call_args
-        assert activity_call[1]["action"] == "send_message"
-        assert activity_call[1]["resource_type"] == "message"
-        assert activity_call[1]["user_id"] == "1"  # User ID from conversation
-        
-        # Verify orchestrator result was logged
-        mock_log_result.assert_called_once()
-        result_call = mock_log_result.call_args
-        assert result_call[1]["input_type"] in ["simple_message", "brain_dump"]
-        assert result_call[1]["success"] is True
-        assert result_call[1]["items_created"] >= 1
-        
-        # Verify LLM call was logged
-        mock_log_llm.assert_called_once()
-        llm_call = mock_log_llm.call_args
-        assert llm_call[1]["model"] == "test-model"
-        assert llm_call[1]["provider"] == "ollama"
-        assert llm_call[1]["success"] is True
-        assert llm_call[1]["total_tokens"] > 0
+    response = client.post(
+        "/api/conversations/1/messages", 
+        json={"text": "Test message for telemetry"}, 
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    
+    # Verify user activity was logged
+    mock_telemetry.activity.assert_called_once()
+    activity_call = mock_telemetry.activity.call_args
+    assert activity_call[1]["action"] == "send_message"
+    assert activity_call[1]["resource_type"] == "message"
+    assert activity_call[1]["user_id"] == "1"  # User ID from conversation
+    
+    # Verify orchestrator result was logged
+    mock_telemetry.result.assert_called_once()
+    result_call = mock_telemetry.result.call_args
+    assert result_call[1]["input_type"] in ["simple_message", "brain_dump"]
+    assert result_call[1]["success"] is True
+    assert result_call[1]["items_created"] >= 1
+    
+    # Verify LLM call was logged
+    mock_telemetry.llm.assert_called_once()
+    llm_call = mock_telemetry.llm.call_args
+    assert llm_call[1]["model"] == "test-model"
+    assert llm_call[1]["provider"] == "ollama"
+    assert llm_call[1]["success"] is True
+    assert llm_call[1]["total_tokens"] > 0
 
 
 def test_telemetry_logs_request_lifecycle(client):
@@ -75,7 +86,7 @@ def test_telemetry_logs_request_lifecycle(client):
         # Verify request start was logged
         mock_log_start.assert_called_once()
         start_call = mock_log_start.call_args
-        assert start_call[0][0].method == "GET"  # First arg is the request
+        assert start_call[0][0]["method"] == "GET"  # First arg is the ASGI scope
         assert start_call[0][2] == "telemetry_lifecycle_test_user"  # Third arg is user_id
         
         # Verify request end was logged
@@ -171,3 +182,29 @@ def test_telemetry_tracks_different_endpoints(client):
     assert response.status_code == 200
     assert "x-request-id" in response.headers
     assert response.headers["x-ratelimit-limit"] == "20"  # Tasks have 20/min limit
+
+
+@pytest.mark.asyncio
+async def test_telemetry_middleware_copies_response_headers():
+    """Test that telemetry headers never accumulate on a header list the app reuses."""
+    from app.middleware.telemetry import TelemetryMiddleware
+
+    shared_headers = [(b"content-type", b"text/plain")]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": shared_headers})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = TelemetryMiddleware(app)
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""}
+
+    for _ in range(2):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware(scope, None, send)
+        names = [name for name, _ in sent[0]["headers"]]
+        assert names == [b"content-type", b"x-request-id", b"x-response-time"]
+    assert shared_headers == [(b"content-type", b"text/plain")]